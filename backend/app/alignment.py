@@ -4,11 +4,13 @@ import re
 from pathlib import Path
 from typing import Any, cast
 
+from .jsonio import read_json
+
 
 def build_alignment_map(
     parsed_path: Path, symbol_path: Path, text_index_path: Path
 ) -> dict[str, object]:
-    paper = json.loads(parsed_path.read_text(encoding="utf-8"))
+    paper = read_json(parsed_path)
     symbols = _safe_load_json(symbol_path)
     text_index = _safe_load_json(text_index_path)
 
@@ -82,7 +84,7 @@ def write_alignment(dest_path: Path, data: dict[str, object]) -> None:
 def _safe_load_json(path: Path) -> dict[str, object]:
     if not path.exists():
         return {}
-    return json.loads(path.read_text(encoding="utf-8"))
+    return read_json(path)
 
 
 def _tokenize(text: str) -> list[str]:
@@ -1,8 +1,23 @@
+import heapq
 import json
 import math
 import re
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
+from .jsonio import read_json
+from .process_pool import LazyProcessPool, default_workers
+
+# The length floor is in the pattern, so short words are never materialized.
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9_]{2,}")
+_HAN_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+
+# Below this many documents, pool dispatch and pickling cost more than they save.
+_PARALLEL_MIN_DOCS = 256
+_POOL_CHUNKSIZE = 32
+_tokenize_pool = LazyProcessPool()
+
 
 def build_bm25_index(
     docs: list[dict[str, str]],
@@ -10,19 +25,17 @@ def build_bm25_index(
     b: float = 0.75,
     epsilon: float = 0.25,
 ) -> dict[str, object]:
-    tokenized = [(_doc_id(doc), _tokenize(doc.get("text", ""))) for doc in docs]
-    doc_count = len(tokenized)
+    doc_ids_in = [_doc_id(doc) for doc in docs]
+    counted = _count_terms([doc.get("text", "") for doc in docs])
+    doc_count = len(doc_ids_in)
     doc_len: dict[str, int] = {}
-    df: dict[str, int] = {}
+    df: Counter[str] = Counter()
     postings: dict[str, list[tuple[str, int]]] = {}
 
-    for doc_id, tokens in tokenized:
-        doc_len[doc_id] = len(tokens)
-        tf: dict[str, int] = {}
-        for token in tokens:
-            tf[token] = tf.get(token, 0) + 1
+    for doc_id, (length, tf) in zip(doc_ids_in, counted):
+        doc_len[doc_id] = length
+        df.update(tf.keys())
         for token, count in tf.items():
-            df[token] = df.get(token, 0) + 1
             postings.setdefault(token, []).append((doc_id, count))
 
     avgdl = (sum(doc_len.values()) / doc_count) if doc_count else 0.0
@@ -40,31 +53,96 @@ def build_bm25_index(
             if float(value) < 0.0:
                 idf[token] = float(floor_value)
 
+    # Everything in a BM25 term score except the query's token set is known at
+    # build time, so each posting stores its final impact
+    # idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)) and a query just
+    # sums impacts. Postings are columnar (doc positions into doc_ids, impacts)
+    # so doc ids are not repeated once per token.
+    doc_ids = list(doc_len)
+    doc_pos = {doc_id: pos for pos, doc_id in enumerate(doc_ids)}
+    postings_out: dict[str, list[list[object]]] = {}
+    if avgdl > 0.0:
+        k1 = float(k1)
+        b = float(b)
+        for token, entries in postings.items():
+            token_idf = float(idf[token])
+            if token_idf <= 0.0:
+                continue
+            positions: list[object] = []
+            impacts: list[object] = []
+            for doc_id, tf in entries:
+                dl = doc_len[doc_id]
+                if dl > 0:
+                    positions.append(doc_pos[doc_id])
+                    impacts.append(_impact(token_idf, float(tf), dl, avgdl, k1, b))
+            postings_out[token] = [positions, impacts]
+
     return {
-        "schema_version": 2,
+        "schema_version": 4,
         "doc_count": doc_count,
         "avgdl": avgdl,
         "k1": float(k1),
         "b": float(b),
         "epsilon": float(epsilon),
-        "idf": idf,
-        "doc_len": doc_len,
-        "postings": {
-            k: [[doc_id, tf] for doc_id, tf in v] for k, v in postings.items()
-        },
+        "doc_ids": doc_ids,
+        "postings": postings_out,
     }
 
 
+def _count_terms(texts: list[str]) -> list[tuple[int, dict[str, int]]]:
+    """Per-text (token count, term frequencies), in input order.
+
+    Large corpora are tokenized on the shared process pool: the work is pure
+    Python regex/dict code, so threads would serialize on the GIL. Workers
+    return term-frequency dicts rather than token lists to keep pickling small.
+    """
+    if len(texts) <= _PARALLEL_MIN_DOCS or default_workers() < 2:
+        return [_term_frequencies(text) for text in texts]
+    try:
+        pool = _tokenize_pool.get()
+        return list(pool.map(_term_frequencies, texts, chunksize=_POOL_CHUNKSIZE))
+    except (BrokenProcessPool, OSError):
+        shutdown_tokenize_pool()
+        return [_term_frequencies(text) for text in texts]
+
+
+def _term_frequencies(text: str) -> tuple[int, dict[str, int]]:
+    tokens = _tokenize(text)
+    return len(tokens), dict(Counter(tokens))
+
+
+def shutdown_tokenize_pool() -> None:
+    _tokenize_pool.shutdown()
+
+
+def _impact(
+    token_idf: float, tf_i: float, dl: float, avgdl: float, k1: float, b: float
+) -> float:
+    denom = tf_i + k1 * (1 - b + b * (dl / avgdl))
+    if denom <= 0.0:
+        return 0.0
+    return float(token_idf * (tf_i * (k1 + 1)) / denom)
+
+
 def write_bm25_index(path: Path, data: dict[str, object]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8")
+    path.write_text(
+        json.dumps(data, ensure_ascii=True, separators=(",", ":")), encoding="utf-8"
+    )
 
 
 def load_bm25_index(path: Path) -> dict[str, object]:
+    """Load an index and normalize it to the query-ready schema 4 layout.
+
+    Older indices (per-posting raw tf in v2, [doc_id, impact] pairs in v3) are
+    converted once here, so the query path never re-validates postings.
+    """
     if not path.exists():
         return {}
-    raw = json.loads(path.read_text(encoding="utf-8"))
-    return raw if isinstance(raw, dict) else {}  # type: ignore[reportMissingTypeArgument]
+    raw = read_json(path)
+    if not isinstance(raw, dict):  # type: ignore[reportMissingTypeArgument]
+        return {}
+    return _prepare_index(raw)
 
 
 def query_bm25_index(
@@ -73,35 +151,107 @@ def query_bm25_index(
     tokens = _tokenize(question)
     if not tokens:
         return []
-
-    idf = _as_float_dict(index.get("idf"))
-    postings = _as_postings(index.get("postings"))
-    doc_len = _as_float_dict(index.get("doc_len"))
-    avgdl = _as_float(index.get("avgdl"))
-    k1 = _as_float(index.get("k1"), default=1.2)
-    b = _as_float(index.get("b"), default=0.75)
-    if not postings or not doc_len or avgdl <= 0.0:
+    if index.get("schema_version") != 4:
+        index = _prepare_index(index)
+    doc_ids = index.get("doc_ids")
+    postings = index.get("postings")
+    if not isinstance(doc_ids, list) or not isinstance(postings, dict):  # type: ignore[reportMissingTypeArgument]
         return []
 
-    scores: dict[str, float] = {}
+    # Dense accumulator indexed by doc position: list indexing is cheaper than
+    # hashing into a dict per posting. Impacts are positive, so a zero slot is
+    # one no token has touched yet; touched keeps first-touch order for ties.
+    scores = [0.0] * len(doc_ids)
+    touched: list[int] = []
     for token in set(tokens):
+        entry = postings.get(token)
+        if entry is None:
+            continue
+        positions, impacts = entry
+        for pos, impact in zip(positions, impacts):
+            if not scores[pos]:
+                touched.append(pos)
+            scores[pos] += impact
+
+    best = heapq.nlargest(top_k, touched, key=scores.__getitem__)
+    return [(doc_ids[pos], scores[pos]) for pos in best]
+
+
+def _prepare_index(raw: dict[str, object]) -> dict[str, object]:
+    version = _as_float(raw.get("schema_version"))
+    if version >= 4:
+        return _validate_columnar(raw)
+    postings = _as_postings(raw.get("postings"))
+    if version < 3:
+        postings = _legacy_impacts(raw, postings)
+    doc_ids: list[str] = []
+    doc_pos: dict[str, int] = {}
+    columnar: dict[str, list[list[object]]] = {}
+    for token, entries in postings.items():
+        positions: list[object] = []
+        impacts: list[object] = []
+        for doc_id, impact in entries:
+            pos = doc_pos.get(doc_id)
+            if pos is None:
+                pos = doc_pos[doc_id] = len(doc_ids)
+                doc_ids.append(doc_id)
+            positions.append(pos)
+            impacts.append(impact)
+        columnar[token] = [positions, impacts]
+    return {**raw, "schema_version": 4, "doc_ids": doc_ids, "postings": columnar}
+
+
+def _validate_columnar(raw: dict[str, object]) -> dict[str, object]:
+    doc_ids = raw.get("doc_ids")
+    postings = raw.get("postings")
+    if not isinstance(doc_ids, list) or not isinstance(postings, dict):  # type: ignore[reportMissingTypeArgument]
+        return {**raw, "doc_ids": [], "postings": {}}
+    ids = [str(doc_id) for doc_id in doc_ids]
+    cleaned: dict[str, list[list[object]]] = {}
+    for token, entry in postings.items():
+        if not isinstance(entry, list) or len(entry) != 2:  # type: ignore[reportMissingTypeArgument]
+            continue
+        if not isinstance(entry[0], list) or not isinstance(entry[1], list):  # type: ignore[reportMissingTypeArgument]
+            continue
+        positions: list[object] = []
+        impacts: list[object] = []
+        for pos, impact in zip(entry[0], entry[1]):
+            value = _as_float(impact)
+            if isinstance(pos, int) and 0 <= pos < len(ids) and value > 0.0:
+                positions.append(pos)
+                impacts.append(value)
+        if positions:
+            cleaned[str(token)] = [positions, impacts]
+    return {**raw, "doc_ids": ids, "postings": cleaned}
+
+
+def _legacy_impacts(
+    raw: dict[str, object], postings: dict[str, list[tuple[str, float]]]
+) -> dict[str, list[tuple[str, float]]]:
+    """Turn schema 2 raw-tf postings into impact postings."""
+    idf = _as_float_dict(raw.get("idf"))
+    doc_len = _as_float_dict(raw.get("doc_len"))
+    avgdl = _as_float(raw.get("avgdl"))
+    k1 = _as_float(raw.get("k1"), default=1.2)
+    b = _as_float(raw.get("b"), default=0.75)
+    if not doc_len or avgdl <= 0.0:
+        return {}
+    out: dict[str, list[tuple[str, float]]] = {}
+    for token, entries in postings.items():
         token_idf = float(idf.get(token, 0.0))
         if token_idf <= 0.0:
             continue
-        for doc_id, tf_i in postings.get(token, []):
+        impacts: list[tuple[str, float]] = []
+        for doc_id, tf_i in entries:
             dl = float(doc_len.get(doc_id, 0.0))
             if dl <= 0.0:
                 continue
-            if tf_i <= 0.0:
-                continue
-            denom = tf_i + k1 * (1 - b + b * (dl / avgdl))
-            if denom <= 0.0:
-                continue
-            inc = token_idf * (tf_i * (k1 + 1)) / denom
-            scores[doc_id] = scores.get(doc_id, 0.0) + float(inc)
-
-    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-    return ranked[:top_k]
+            impact = _impact(token_idf, tf_i, dl, avgdl, k1, b)
+            if impact > 0.0:
+                impacts.append((doc_id, impact))
+        if impacts:
+            out[token] = impacts
+    return out
 
 
 def _as_float(value: object, default: float = 0.0) -> float:
@@ -150,13 +300,13 @@ def _doc_id(doc: dict[str, str]) -> str:
 
 
 def _tokenize(text: str) -> list[str]:
-    raw = re.findall(r"[A-Za-z][A-Za-z0-9_]+", text)
-    tokens = [token.lower() for token in raw if len(token) >= 3]
+    tokens = [token.lower() for token in _WORD_RE.findall(text)]
+    if text.isascii():
+        return tokens
     # Add minimal CJK support: bigrams for Han runs.
-    for run in re.findall(r"[\u4e00-\u9fff]+", text):
+    for run in _HAN_RUN_RE.findall(text):
         if len(run) == 1:
             tokens.append(run)
         else:
-            for idx in range(len(run) - 1):
-                tokens.append(run[idx : idx + 2])
+            tokens.extend([run[idx : idx + 2] for idx in range(len(run) - 1)])
     return tokens
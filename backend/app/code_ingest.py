@@ -13,6 +13,10 @@ from .config import (
     CODE_INDEX_MAX_TOTAL_BYTES,
 )
 
+# Index files are machine-read on every ask/align; skip pretty-printing so they
+# are smaller on disk and cheaper to parse.
+_COMPACT_SEPARATORS = (",", ":")
+
 
 def clone_or_update_repo(repo_url: str, repo_dir: Path) -> None:
     repo_dir.parent.mkdir(parents=True, exist_ok=True)
@@ -203,21 +207,24 @@ def _match_symbol(ext: str, line: str) -> Dict[str, str] | None:
 def write_code_index(dest_path: Path, data: Dict[str, object]) -> None:
     dest_path.parent.mkdir(parents=True, exist_ok=True)
     dest_path.write_text(
-        json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"
+        json.dumps(data, ensure_ascii=True, separators=_COMPACT_SEPARATORS),
+        encoding="utf-8",
     )
 
 
 def write_symbol_index(dest_path: Path, data: Dict[str, object]) -> None:
     dest_path.parent.mkdir(parents=True, exist_ok=True)
     dest_path.write_text(
-        json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"
+        json.dumps(data, ensure_ascii=True, separators=_COMPACT_SEPARATORS),
+        encoding="utf-8",
     )
 
 
 def write_text_index(dest_path: Path, data: Dict[str, object]) -> None:
     dest_path.parent.mkdir(parents=True, exist_ok=True)
     dest_path.write_text(
-        json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"
+        json.dumps(data, ensure_ascii=True, separators=_COMPACT_SEPARATORS),
+        encoding="utf-8",
     )
 
 
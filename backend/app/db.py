@@ -1,17 +1,48 @@
 import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Mapping
 
 from .config import DB_PATH
 
+_MMAP_SIZE = 256 * 1024 * 1024
+_ROW_CACHE_SIZE = 512
+_row_cache: OrderedDict[str, sqlite3.Row] = OrderedDict()
+_row_cache_lock = threading.Lock()
+_thread_state = threading.local()
+
 
 def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=5.0)
     conn.row_factory = sqlite3.Row
+    # WAL (set once in init_db) is durable with NORMAL sync: no fsync per commit.
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # Read pages through a shared mapping instead of read() into private buffers.
+    conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+    return conn
+
+
+def thread_connection() -> sqlite3.Connection:
+    """This thread's long-lived connection, opened on first use.
+
+    Request handlers run on a fixed set of worker threads, so reusing one
+    connection per thread skips the open + PRAGMA setup on every request. Do not
+    close it; use it as a context manager (`with conn:`), which commits on
+    success and rolls back on error.
+    """
+    conn = getattr(_thread_state, "conn", None)
+    if conn is None:
+        conn = get_connection()
+        _thread_state.conn = conn
     return conn
 
 
 def init_db() -> None:
     conn = get_connection()
     try:
+        # Persistent per database file: readers no longer block the writer.
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS projects (
@@ -20,6 +51,7 @@ def init_db() -> None:
                 paper_url TEXT NOT NULL,
                 repo_url TEXT NOT NULL,
                 focus_points TEXT,
+                focus_points_joined TEXT,
                 doc_urls TEXT,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
@@ -45,6 +77,7 @@ def init_db() -> None:
         # Define all columns that should exist
         required_columns = [
             ("focus_points", "TEXT"),
+            ("focus_points_joined", "TEXT"),
             ("doc_urls", "TEXT"),
             ("paper_hash", "TEXT"),
             ("repo_hash", "TEXT"),
@@ -67,6 +100,62 @@ def init_db() -> None:
                 except sqlite3.OperationalError:
                     pass  # Column might exist or other issue, ignore safely
 
+        # Backs keyset pagination in GET /projects.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_projects_created_at "
+            "ON projects (created_at DESC, id DESC)"
+        )
+
         conn.commit()
     finally:
         conn.close()
+
+
+def _cache_row(project_id: str, row: sqlite3.Row, replace: bool) -> None:
+    with _row_cache_lock:
+        if replace or project_id not in _row_cache:
+            _row_cache[project_id] = row
+        _row_cache.move_to_end(project_id)
+        while len(_row_cache) > _ROW_CACHE_SIZE:
+            _row_cache.popitem(last=False)
+
+
+def get_project_row(project_id: str) -> sqlite3.Row | None:
+    """Return the projects row for project_id, served from an LRU cache."""
+    with _row_cache_lock:
+        row = _row_cache.get(project_id)
+        if row is not None:
+            _row_cache.move_to_end(project_id)
+            return row
+    conn = thread_connection()
+    with conn:
+        row = conn.execute(
+            "SELECT * FROM projects WHERE id = ?", (project_id,)
+        ).fetchone()
+    if row is not None:
+        # Never clobber a row an update cached while this read was in flight.
+        _cache_row(project_id, row, replace=False)
+    return row
+
+
+def update_project_row(
+    project_id: str, values: Mapping[str, object]
+) -> sqlite3.Row | None:
+    """Apply values to the project and refresh the cache from RETURNING *."""
+    assignments = ", ".join(f"{column} = ?" for column in values)
+    conn = thread_connection()
+    with conn:
+        row = conn.execute(
+            f"UPDATE projects SET {assignments} WHERE id = ? RETURNING *",
+            (*values.values(), project_id),
+        ).fetchone()
+    if row is None:
+        evict_project_row(project_id)
+    else:
+        _cache_row(project_id, row, replace=True)
+    return row
+
+
+def evict_project_row(project_id: str) -> None:
+    with _row_cache_lock:
+        _row_cache.pop(project_id, None)
@@ -2,17 +2,31 @@ import hashlib
 import html
 import json
 import re
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Dict, List
 
 import pdfplumber
 import requests
+from requests.adapters import HTTPAdapter
 
 from .config import PAPER_MAX_PAGES, PAPER_MAX_PARAGRAPHS, PAPER_MAX_PDF_BYTES
+from .process_pool import LazyProcessPool
 
 
 ARXIV_ABS_RE = re.compile(r"arxiv\.org/(abs|pdf)/(?P<id>[^/]+)")
 
+# Shared session so repeated paper/doc fetches reuse keep-alive connections
+# (arxiv.org in particular) instead of paying a TCP+TLS handshake per call.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_http.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+
+# Pages per worker task when parsing a PDF; a typical paper splits into 2-3.
+_PDF_PAGES_PER_TASK = 16
+_pdf_pool = LazyProcessPool()
+
 
 def resolve_paper_url(url: str) -> str:
     match = ARXIV_ABS_RE.search(url)
@@ -24,32 +38,32 @@ def resolve_paper_url(url: str) -> str:
 
 def download_pdf(url: str, dest_path: Path) -> None:
     dest_path.parent.mkdir(parents=True, exist_ok=True)
-    response = requests.get(url, timeout=60, stream=True)
-    response.raise_for_status()
-    content_length = response.headers.get("Content-Length")
-    if content_length and content_length.isdigit():
-        if int(content_length) > PAPER_MAX_PDF_BYTES:
-            raise ValueError(
-                f"PDF too large: {content_length} bytes (limit {PAPER_MAX_PDF_BYTES})"
-            )
-    written = 0
-    try:
-        with dest_path.open("wb") as handle:
-            for chunk in response.iter_content(chunk_size=1024 * 1024):
-                if not chunk:
-                    continue
-                written += len(chunk)
-                if written > PAPER_MAX_PDF_BYTES:
-                    raise ValueError(
-                        f"PDF too large while downloading: {written} bytes (limit {PAPER_MAX_PDF_BYTES})"
-                    )
-                handle.write(chunk)
-    except Exception:
+    with _http.get(url, timeout=60, stream=True) as response:
+        response.raise_for_status()
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > PAPER_MAX_PDF_BYTES:
+                raise ValueError(
+                    f"PDF too large: {content_length} bytes (limit {PAPER_MAX_PDF_BYTES})"
+                )
+        written = 0
         try:
-            dest_path.unlink(missing_ok=True)
-        except OSError:
-            pass
-        raise
+            with dest_path.open("wb") as handle:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    if not chunk:
+                        continue
+                    written += len(chunk)
+                    if written > PAPER_MAX_PDF_BYTES:
+                        raise ValueError(
+                            f"PDF too large while downloading: {written} bytes (limit {PAPER_MAX_PDF_BYTES})"
+                        )
+                    handle.write(chunk)
+        except Exception:
+            try:
+                dest_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            raise
 
 
 def file_sha256(path: Path) -> str:
@@ -61,12 +75,44 @@ def file_sha256(path: Path) -> str:
 
 
 def parse_pdf_to_paragraphs(pdf_path: Path) -> List[Dict[str, str]]:
-    results: List[Dict[str, str]] = []
+    """Extract paragraphs page-range by page-range on the PDF worker processes.
+
+    Text extraction is CPU-bound pure Python, so running it in worker processes
+    keeps it off the API process's GIL and spreads long PDFs across cores.
+    """
     with pdfplumber.open(str(pdf_path)) as pdf:
-        for page_index, page in enumerate(pdf.pages, start=1):
-            if page_index > PAPER_MAX_PAGES:
-                break
-            text = page.extract_text() or ""
+        page_count = min(len(pdf.pages), PAPER_MAX_PAGES)
+    ranges = [
+        (start, min(start + _PDF_PAGES_PER_TASK, page_count + 1))
+        for start in range(1, page_count + 1, _PDF_PAGES_PER_TASK)
+    ]
+    try:
+        pool = _pdf_pool.get()
+        futures = [
+            pool.submit(_parse_pdf_pages, str(pdf_path), start, stop)
+            for start, stop in ranges
+        ]
+        chunks = [future.result() for future in futures]
+    except (BrokenProcessPool, OSError):
+        shutdown_pdf_pool()
+        chunks = [
+            _parse_pdf_pages(str(pdf_path), start, stop) for start, stop in ranges
+        ]
+
+    results: List[Dict[str, str]] = []
+    for chunk in chunks:
+        results.extend(chunk)
+        if len(results) >= PAPER_MAX_PARAGRAPHS:
+            return results[:PAPER_MAX_PARAGRAPHS]
+    return results
+
+
+def _parse_pdf_pages(pdf_path: str, start: int, stop: int) -> List[Dict[str, str]]:
+    """Paragraphs of 1-based pages [start, stop); runs in a worker process."""
+    results: List[Dict[str, str]] = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_index in range(start, stop):
+            text = pdf.pages[page_index - 1].extract_text() or ""
             for paragraph in _split_paragraphs(text):
                 results.append({"page": str(page_index), "text": paragraph})
                 if len(results) >= PAPER_MAX_PARAGRAPHS:
@@ -74,13 +120,17 @@ def parse_pdf_to_paragraphs(pdf_path: Path) -> List[Dict[str, str]]:
     return results
 
 
+def shutdown_pdf_pool() -> None:
+    _pdf_pool.shutdown()
+
+
 def _split_paragraphs(text: str) -> List[str]:
     raw = [chunk.strip() for chunk in re.split(r"\n\s*\n", text) if chunk.strip()]
     return [re.sub(r"\s+", " ", chunk) for chunk in raw]
 
 
 def fetch_webpage_paragraphs(url: str, max_paragraphs: int = 200) -> List[str]:
-    res = requests.get(url, timeout=30)
+    res = _http.get(url, timeout=30)
     res.raise_for_status()
     content_type = str(res.headers.get("Content-Type", "")).lower()
     text = res.text
@@ -121,6 +171,7 @@ def _html_to_text(raw_html: str) -> str:
 
 def write_parsed_json(dest_path: Path, data: Dict[str, object]) -> None:
     dest_path.parent.mkdir(parents=True, exist_ok=True)
+    # Compact: parsed.json is re-read by alignment, indexing and overview paths.
     dest_path.write_text(
-        json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"
+        json.dumps(data, ensure_ascii=True, separators=(",", ":")), encoding="utf-8"
     )
@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAVE_ORJSON = orjson is not None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# What a malformed document raises from loads/read_json/iter_items.
+JSON_ERRORS: tuple[type[Exception], ...] = (json.JSONDecodeError,)
+if ijson is not None:
+    JSON_ERRORS += (ijson.JSONError,)
+
+
+def loads(data: bytes | str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+    # catching the stdlib exception either way.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json(path: Path) -> Any:
+    """Parse a UTF-8 JSON file straight from bytes (no intermediate str)."""
+    return loads(path.read_bytes())
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes, non-ASCII kept as-is (for responses and SSE)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_items(path: Path, prefix: str) -> Iterator[Any]:
+    """Yield the elements of the array at an ijson-style prefix ("a.b.item").
+
+    With ijson installed the file is stream-parsed, so only one element is held
+    in memory at a time; otherwise the whole document is parsed and walked.
+    """
+    if ijson is not None:
+        with path.open("rb") as handle:
+            yield from ijson.items(handle, prefix, use_float=True)
+        return
+    keys = prefix.split(".")
+    if keys[-1] != "item":
+        raise ValueError(f"prefix must address array items: {prefix!r}")
+    node = read_json(path)
+    for key in keys[:-1]:
+        if not isinstance(node, dict):
+            return
+        node = node.get(key)
+    if isinstance(node, list):
+        yield from node
@@ -4,6 +4,7 @@ from typing import Dict, Generator, List, Mapping, Optional
 import requests
 
 from .config import LLM_API_BASE, LLM_API_KEY, LLM_MODEL, LLM_PROVIDER
+from .jsonio import loads as json_loads
 
 
 class LLMError(RuntimeError):
@@ -140,13 +141,13 @@ def _call_openai_compatible_stream(prompt: str) -> Generator[str, None, None]:
 
         for line in res.iter_lines():
             if line:
-                line_str = line.decode("utf-8")
-                if line_str.startswith("data: "):
-                    data_str = line_str[6:]
-                    if data_str.strip() == "[DONE]":
+                # Parse the SSE payload straight from bytes: no per-token decode.
+                if line.startswith(b"data: "):
+                    data_bytes = line[6:]
+                    if data_bytes.strip() == b"[DONE]":
                         return
                     try:
-                        data = json.loads(data_str)
+                        data = json_loads(data_bytes)
                         if "choices" in data and len(data["choices"]) > 0:
                             delta = data["choices"][0].get("delta", {})
                             content = delta.get("content", "")
@@ -364,13 +365,13 @@ def _call_openai_compatible_stream_with_system(
 
         for line in res.iter_lines():
             if line:
-                line_str = line.decode("utf-8")
-                if line_str.startswith("data: "):
-                    data_str = line_str[6:]
-                    if data_str.strip() == "[DONE]":
+                # Parse the SSE payload straight from bytes: no per-token decode.
+                if line.startswith(b"data: "):
+                    data_bytes = line[6:]
+                    if data_bytes.strip() == b"[DONE]":
                         return
                     try:
-                        data = json.loads(data_str)
+                        data = json_loads(data_bytes)
                         if "choices" in data and len(data["choices"]) > 0:
                             delta = data["choices"][0].get("delta", {})
                             content = delta.get("content", "")
@@ -1,22 +1,44 @@
+import asyncio
 import json
 import heapq
-import itertools
+import logging
 import re
 import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from urllib.parse import urlparse
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Any, List
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Any, AsyncIterator, Callable, Iterator, List, Sequence
 from uuid import uuid4
 
 import requests
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    ORJSONResponse,
+    StreamingResponse,
+)
 
 from .config import PROJECTS_DIR
-from .db import get_connection, init_db
+from .jsonio import HAVE_ORJSON, JSON_ERRORS
+from .jsonio import dumps as json_dumps
+from .jsonio import iter_items as iter_json_items
+from .jsonio import loads as json_loads
+from .jsonio import read_json
+from .db import (
+    evict_project_row,
+    get_project_row,
+    init_db,
+    thread_connection,
+    update_project_row,
+)
 from .code_ingest import (
     build_file_index,
     build_symbol_index,
@@ -38,6 +60,7 @@ from .bm25_index import (
     build_bm25_index,
     load_bm25_index,
     query_bm25_index,
+    shutdown_tokenize_pool,
     write_bm25_index,
 )
 from .ingest import (
@@ -46,8 +69,11 @@ from .ingest import (
     file_sha256,
     parse_pdf_to_paragraphs,
     resolve_paper_url,
+    shutdown_pdf_pool,
     write_parsed_json,
 )
+from .paragraph_store import offsets_path as paragraph_offsets_path
+from .paragraph_store import open_paragraph_store, write_paragraph_store
 from .schemas import (
     AlignmentResponse,
     AlignmentGetResponse,
@@ -56,6 +82,7 @@ from .schemas import (
     CodeIndexResponse,
     CodeFileResponse,
     CodeSnippetResponse,
+    IngestAllResponse,
     IngestResponse,
     OverviewResponse,
     ProjectCreate,
@@ -75,51 +102,119 @@ from .storage import (
     append_project_summary,
     append_qa_log,
     ensure_project_dirs,
+    find_qa_entry,
+    qa_log_path,
     read_project_overview,
     read_project_summary,
-    read_qa_log,
+    write_json_atomic,
     write_project_overview,
     write_project_meta,
 )
 
 
-app = FastAPI(title="Paper-Code Align")
+logger = logging.getLogger(__name__)
 
-app.add_middleware(
-    CORSMiddleware,
-    # Local dev: browsers may use localhost, 127.0.0.1, or IPv6 loopback.
-    allow_origins=[
+# orjson encodes every JSON response body directly to UTF-8 bytes in C.
+app = FastAPI(
+    title="Paper-Code Align",
+    default_response_class=ORJSONResponse if HAVE_ORJSON else JSONResponse,
+)
+
+# Local dev: browsers may use localhost, 127.0.0.1, or IPv6 loopback.
+_DEV_ORIGINS = frozenset(
+    {
         "http://localhost:5173",
         "http://127.0.0.1:5173",
         "http://[::1]:5173",
-    ],
-    # Vite may auto-increment the port (e.g. 5174) if 5173 is taken.
-    # Also allow common LAN dev origins (RFC1918) for cases where the UI is opened
-    # via a machine IP (e.g. http://192.168.x.x:5173).
-    allow_origin_regex=(
-        r"^https?://("
-        r"localhost|127\.0\.0\.1|\[::1\]|0\.0\.0\.0|"
-        r"10\.\d{1,3}\.\d{1,3}\.\d{1,3}|"
-        r"192\.168\.\d{1,3}\.\d{1,3}|"
-        r"172\.(1[6-9]|2\d|3[0-1])\.\d{1,3}\.\d{1,3}"
-        r")(?:\:\d+)?$"
-    ),
+    }
+)
+# Vite may auto-increment the port (e.g. 5174) if 5173 is taken.
+# Also allow common LAN dev origins (RFC1918) for cases where the UI is opened
+# via a machine IP (e.g. http://192.168.x.x:5173). Origins are ASCII, so the
+# pattern is compiled once with re.ASCII (Starlette's re.compile returns it as-is).
+_DEV_ORIGIN_RE = re.compile(
+    r"^https?://("
+    r"localhost|127\.0\.0\.1|\[::1\]|0\.0\.0\.0|"
+    r"10\.\d{1,3}\.\d{1,3}\.\d{1,3}|"
+    r"192\.168\.\d{1,3}\.\d{1,3}|"
+    r"172\.(1[6-9]|2\d|3[0-1])\.\d{1,3}\.\d{1,3}"
+    r")(?:\:\d+)?$",
+    re.ASCII,
+)
+
+
+class _DevCORSMiddleware(CORSMiddleware):
+    def is_allowed_origin(self, origin: str) -> bool:
+        # O(1) set lookup for the common static origins before the regex.
+        if origin in self.allow_origins:
+            return True
+        return super().is_allowed_origin(origin)
+
+
+app.add_middleware(
+    _DevCORSMiddleware,
+    allow_origins=_DEV_ORIGINS,
+    allow_origin_regex=_DEV_ORIGIN_RE,  # type: ignore[arg-type]
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
+
+# Shared pool for overlapping the blocking index reads and retrieval queries in
+# the ask path. Jobs on it must not submit back to it.
+_INDEX_IO_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="index-io")
+
+# Parsed per-project data (retrieval indices, paragraphs, code chunks, alignment
+# evidence) keyed by (project_id, kind), each stored with the (mtime_ns, size) of
+# its source files so a rebuilt file is picked up on the next ask. Cached values
+# are shared across requests and must be treated as read-only. A project uses up
+# to 8 kinds (4 vector/BM25 indices, paper excerpts, code chunks, symbol tokens,
+# alignment evidence), so 64 entries keep about 8 projects fully warm.
+_INDEX_CACHE_SIZE = 64
+_index_cache: OrderedDict[tuple[str, str], tuple[tuple[object, ...], Any]] = (
+    OrderedDict()
 )
+_index_cache_lock = threading.Lock()
+
+
+# Project directories renamed by delete_project and awaiting removal.
+_DELETED_DIR_MARKER = ".deleted."
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
     init_db()
+    leftovers = list(PROJECTS_DIR.glob(f"*{_DELETED_DIR_MARKER}*"))
+    if leftovers:
+        # Deletions interrupted by a restart; finish them without delaying startup.
+        threading.Thread(
+            target=_remove_dirs, args=(leftovers,), name="project-sweep", daemon=True
+        ).start()
+
+
+def _remove_dirs(paths: list[Path]) -> None:
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    _INDEX_IO_POOL.shutdown(wait=False, cancel_futures=True)
+    shutdown_pdf_pool()
+    shutdown_tokenize_pool()
 
 
 def _row_to_project(row) -> ProjectOut:
-    focus_points = json.loads(row["focus_points"]) if row["focus_points"] else None
-    doc_urls = json.loads(row["doc_urls"]) if row["doc_urls"] else None
-    return ProjectOut(
+    focus_points = (
+        list(_decode_focus_points(row["focus_points"])) if row["focus_points"] else None
+    )
+    doc_urls = json_loads(row["doc_urls"]) if row["doc_urls"] else None
+    # Trusted DB row: construct without validation (the response is still
+    # validated once against response_model on the way out).
+    return ProjectOut.model_construct(
         id=row["id"],
         name=row["name"],
         paper_url=row["paper_url"],
@@ -133,6 +228,40 @@ def _row_to_project(row) -> ProjectOut:
     )
 
 
+# Columns needed by the project list view.
+_PROJECT_LIST_COLUMNS = (
+    "id, name, paper_url, repo_url, focus_points, doc_urls, created_at, updated_at,"
+    " paper_hash, repo_hash"
+)
+
+
+def _utc_iso(value: str) -> str:
+    # Stored as datetime.isoformat() ("+00:00"); Pydantic, which serialized this
+    # list before, writes UTC as "Z".
+    return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+
+def _json_or_none(raw: str | None) -> object:
+    return json_loads(raw) if raw else None
+
+
+def _row_to_project_summary(row) -> dict[str, object]:
+    # Plain dict in ProjectOut's field order and JSON form: rows come from our
+    # own DB, so the list view skips model validation.
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "paper_url": row["paper_url"],
+        "repo_url": row["repo_url"],
+        "focus_points": _json_or_none(row["focus_points"]),
+        "doc_urls": _json_or_none(row["doc_urls"]),
+        "created_at": _utc_iso(row["created_at"]),
+        "updated_at": _utc_iso(row["updated_at"]),
+        "paper_hash": row["paper_hash"],
+        "repo_hash": row["repo_hash"],
+    }
+
+
 def _derive_project_name(repo_url: str) -> str:
     parsed = urlparse(repo_url)
     path = (parsed.path or "").strip("/")
@@ -151,7 +280,12 @@ def _derive_project_name(repo_url: str) -> str:
 def create_project(payload: ProjectCreate) -> ProjectOut:
     project_id = str(uuid4())
     now = datetime.now(timezone.utc).isoformat()
-    focus_points = json.dumps(payload.focus_points or [])
+    # Sanitize once at write time so readers can use the stored values as-is.
+    focus_points_raw = [
+        str(item) for item in (payload.focus_points or []) if str(item).strip()
+    ]
+    focus_points = json.dumps(focus_points_raw)
+    focus_points_joined = ", ".join(focus_points_raw)
     doc_urls_raw = [
         str(item).strip() for item in (payload.doc_urls or []) if str(item).strip()
     ]
@@ -167,18 +301,18 @@ def create_project(payload: ProjectCreate) -> ProjectOut:
             "name": name,
             "paper_url": paper_url,
             "repo_url": payload.repo_url,
-            "focus_points": payload.focus_points or [],
+            "focus_points": focus_points_raw,
             "doc_urls": doc_urls_raw,
             "created_at": now,
         },
     )
 
-    conn = get_connection()
-    try:
+    conn = thread_connection()
+    with conn:
         conn.execute(
             """
-            INSERT INTO projects (id, name, paper_url, repo_url, focus_points, doc_urls, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO projects (id, name, paper_url, repo_url, focus_points, focus_points_joined, doc_urls, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 project_id,
@@ -186,21 +320,19 @@ def create_project(payload: ProjectCreate) -> ProjectOut:
                 paper_url,
                 payload.repo_url,
                 focus_points,
+                focus_points_joined,
                 doc_urls,
                 now,
                 now,
             ),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
     return ProjectOut(
         id=project_id,
         name=name,
         paper_url=paper_url,
         repo_url=payload.repo_url,
-        focus_points=payload.focus_points or [],
+        focus_points=focus_points_raw,
         doc_urls=doc_urls_raw,
         created_at=datetime.fromisoformat(now),
         updated_at=datetime.fromisoformat(now),
@@ -209,32 +341,67 @@ def create_project(payload: ProjectCreate) -> ProjectOut:
     )
 
 
+_PROJECT_PAGE_SIZE = 50
+
+
 @app.get("/projects", response_model=List[ProjectOut])
-def list_projects() -> List[ProjectOut]:
-    conn = get_connection()
-    try:
+def list_projects(
+    limit: int | None = Query(None, ge=1, le=500),
+    cursor: str | None = Query(None),
+) -> Response:
+    # Opt-in keyset pagination on (created_at, id): without limit or cursor the
+    # whole list is returned, as before. When paging, the next page cursor is
+    # returned in the X-Next-Cursor header so the body stays a plain list.
+    if limit is None and cursor:
+        limit = _PROJECT_PAGE_SIZE
+    params: list[object] = []
+    where = ""
+    if cursor:
+        cursor_created_at, sep, cursor_id = cursor.partition("|")
+        if not sep or not cursor_created_at or not cursor_id:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where = "WHERE (created_at, id) < (?, ?)"
+        params.extend([cursor_created_at, cursor_id])
+    # LIMIT -1 is SQLite for "no limit".
+    params.append(-1 if limit is None else limit + 1)
+
+    conn = thread_connection()
+    with conn:
         rows = conn.execute(
-            "SELECT * FROM projects ORDER BY created_at DESC"
+            f"""
+            SELECT {_PROJECT_LIST_COLUMNS} FROM projects
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+            """,
+            params,
         ).fetchall()
-    finally:
-        conn.close()
-    return [_row_to_project(row) for row in rows]
+
+    headers: dict[str, str] = {}
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = f"{last['created_at']}|{last['id']}"
+    # Returned as a ready Response so FastAPI doesn't validate every row against
+    # response_model (which still documents the shape).
+    return Response(
+        content=json_dumps([_row_to_project_summary(row) for row in rows]),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 @app.get("/projects/{project_id}", response_model=ProjectDetail)
-def get_project(project_id: str) -> ProjectDetail:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+def get_project(project_id: str, background_tasks: BackgroundTasks) -> ProjectDetail:
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
+    if row["paper_vector_path"] or row["code_vector_path"]:
+        # Opening a project usually precedes asking: load its indices meanwhile.
+        background_tasks.add_task(_warm_index_cache, project_id)
     project = _row_to_project(row)
-    return ProjectDetail(
-        **project.model_dump(),
+    return ProjectDetail.model_construct(
+        **dict(project),
         paper_parsed_path=row["paper_parsed_path"],
         code_index_path=row["code_index_path"],
         alignment_path=row["alignment_path"],
@@ -246,31 +413,46 @@ def get_project(project_id: str) -> ProjectDetail:
 
 
 @app.delete("/projects/{project_id}", response_model=ProjectDeleteResponse)
-def delete_project(project_id: str) -> ProjectDeleteResponse:
-    conn = get_connection()
-    try:
+def delete_project(
+    project_id: str, background_tasks: BackgroundTasks
+) -> ProjectDeleteResponse:
+    tombstone: Path | None = None
+    conn = thread_connection()
+    with conn:
         row = conn.execute(
             "SELECT id FROM projects WHERE id = ?", (project_id,)
         ).fetchone()
         if row is None:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        # Delete DB row but only commit after filesystem cleanup succeeds.
+        # Delete DB row but only commit after the project files are moved aside.
         conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
 
+        # One rename takes the directory out of service; the (possibly slow)
+        # rmtree of the cloned repo and indices runs after the response is sent.
         project_dir = PROJECTS_DIR / project_id
         try:
             if project_dir.exists():
-                shutil.rmtree(project_dir)
+                tombstone = PROJECTS_DIR / (
+                    f"{project_id}{_DELETED_DIR_MARKER}{uuid4().hex}"
+                )
+                project_dir.rename(tombstone)
         except OSError as err:
             conn.rollback()
             raise HTTPException(
                 status_code=500, detail=f"Failed to delete project files: {err}"
             )
 
-        conn.commit()
-    finally:
-        conn.close()
+        try:
+            conn.commit()
+        except Exception:
+            if tombstone is not None:
+                tombstone.rename(project_dir)
+            raise
+    if tombstone is not None:
+        background_tasks.add_task(shutil.rmtree, tombstone, ignore_errors=True)
+    evict_project_row(project_id)
+    _evict_index_cache(project_id)
 
     return ProjectDeleteResponse(project_id=project_id, deleted=True)
 
@@ -282,20 +464,21 @@ def get_summary(project_id: str) -> dict[str, object]:
 
 
 @app.get("/projects/{project_id}/qa")
-def get_qa_log(project_id: str) -> dict[str, object]:
-    entries = read_qa_log(project_id)
-    return {"project_id": project_id, "entries": entries}
+def get_qa_log(project_id: str) -> StreamingResponse:
+    # The log is already one JSON document per line: splice the lines into the
+    # entries array as-is rather than decoding and re-encoding every entry.
+    prefix = json.dumps({"project_id": project_id}, ensure_ascii=True)[:-1]
+    return StreamingResponse(
+        _iter_json_array_from_lines(
+            qa_log_path(project_id), prefix=f'{prefix}, "entries": ['.encode()
+        ),
+        media_type="application/json",
+    )
 
 
 @app.post("/projects/{project_id}/ingest", response_model=IngestResponse)
 def ingest_paper(project_id: str) -> IngestResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
 
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -309,6 +492,26 @@ def ingest_paper(project_id: str) -> IngestResponse:
             parsed_path=str(parsed_path),
         )
 
+    paper_hash = _ingest_paper_files(row, parsed_path)
+
+    now = datetime.now(timezone.utc).isoformat()
+    update_project_row(
+        project_id,
+        {
+            "paper_hash": paper_hash,
+            "paper_parsed_path": str(parsed_path),
+            "updated_at": now,
+        },
+    )
+    _evict_index_cache(project_id)
+
+    return IngestResponse(
+        project_id=project_id, paper_hash=paper_hash, parsed_path=str(parsed_path)
+    )
+
+
+def _ingest_paper_files(row, parsed_path: Path) -> str:
+    """Download, hash and parse the project's paper into parsed_path."""
     paper_url = str(row["paper_url"] or "").strip()
     if not paper_url:
         raise HTTPException(status_code=400, detail="No paper URL set for this project")
@@ -316,7 +519,7 @@ def ingest_paper(project_id: str) -> IngestResponse:
     pdf_url = resolve_paper_url(paper_url)
     if not (pdf_url.startswith("http://") or pdf_url.startswith("https://")):
         raise HTTPException(status_code=400, detail="Invalid paper URL")
-    pdf_path = project_dir / "paper" / "paper.pdf"
+    pdf_path = parsed_path.parent / "paper.pdf"
     try:
         download_pdf(pdf_url, pdf_path)
     except ValueError as err:
@@ -349,45 +552,18 @@ def ingest_paper(project_id: str) -> IngestResponse:
         raise HTTPException(
             status_code=500, detail=f"Failed to save parsed data: {err}"
         )
-
-    now = datetime.now(timezone.utc).isoformat()
-    conn = get_connection()
-    try:
-        conn.execute(
-            """
-            UPDATE projects
-            SET paper_hash = ?, paper_parsed_path = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (paper_hash, str(parsed_path), now, project_id),
-        )
-        conn.commit()
-    finally:
-        conn.close()
-
-    return IngestResponse(
-        project_id=project_id, paper_hash=paper_hash, parsed_path=str(parsed_path)
-    )
+    return paper_hash
 
 
 @app.post("/projects/{project_id}/code-index", response_model=CodeIndexResponse)
 def ingest_code(project_id: str) -> CodeIndexResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
 
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
     project_dir = ensure_project_dirs(project_id)
-    repo_dir = project_dir / "code" / "repo"
     index_path = project_dir / "code" / "index.json"
-    symbol_path = project_dir / "code" / "symbols.json"
-    text_index_path = project_dir / "code" / "text_index.json"
     if row["repo_hash"] and index_path.exists():
         return CodeIndexResponse(
             project_id=project_id,
@@ -395,6 +571,33 @@ def ingest_code(project_id: str) -> CodeIndexResponse:
             index_path=str(index_path),
         )
 
+    repo_hash = _ingest_code_files(row, project_dir / "code")
+
+    now = datetime.now(timezone.utc).isoformat()
+    update_project_row(
+        project_id,
+        {
+            "repo_hash": repo_hash,
+            "code_index_path": str(index_path),
+            "updated_at": now,
+        },
+    )
+    _evict_index_cache(project_id)
+
+    return CodeIndexResponse(
+        project_id=project_id,
+        repo_hash=repo_hash,
+        index_path=str(index_path),
+    )
+
+
+def _ingest_code_files(row, code_dir: Path) -> str:
+    """Clone the project's repo into code_dir and write its three indices."""
+    repo_dir = code_dir / "repo"
+    index_path = code_dir / "index.json"
+    symbol_path = code_dir / "symbols.json"
+    text_index_path = code_dir / "text_index.json"
+
     clone_or_update_repo(row["repo_url"], repo_dir)
     repo_hash = get_repo_hash(repo_dir)
     file_index = build_file_index(repo_dir)
@@ -418,6 +621,7 @@ def ingest_code(project_id: str) -> CodeIndexResponse:
             "symbols": symbol_index,
         },
     )
+    _write_symbol_token_index(code_dir / "symbols_tokens.json", symbol_index)
     write_text_index(
         text_index_path,
         {
@@ -425,38 +629,79 @@ def ingest_code(project_id: str) -> CodeIndexResponse:
             "entries": text_index,
         },
     )
+    return repo_hash
 
-    now = datetime.now(timezone.utc).isoformat()
-    conn = get_connection()
-    try:
-        conn.execute(
-            """
-            UPDATE projects
-            SET repo_hash = ?, code_index_path = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (repo_hash, str(index_path), now, project_id),
-        )
-        conn.commit()
-    finally:
-        conn.close()
 
-    return CodeIndexResponse(
+@app.post("/projects/{project_id}/ingest-all", response_model=IngestAllResponse)
+def ingest_all(project_id: str) -> IngestAllResponse:
+    """Ingest the paper and index the code concurrently.
+
+    The two pipelines are independent (PDF download/parse vs git clone/index),
+    so wall-clock time is max(paper, code) instead of their sum. A project with
+    no paper URL only gets its code indexed.
+    """
+    row = get_project_row(project_id)
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    project_dir = ensure_project_dirs(project_id)
+    parsed_path = project_dir / "paper" / "parsed.json"
+    index_path = project_dir / "code" / "index.json"
+    paper_done = bool(row["paper_hash"]) and parsed_path.exists()
+    code_done = bool(row["repo_hash"]) and index_path.exists()
+    want_paper = not paper_done and bool(str(row["paper_url"] or "").strip())
+
+    paper_future: Future[str] | None = None
+    code_future: Future[str] | None = None
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="ingest") as pool:
+        if want_paper:
+            paper_future = pool.submit(_ingest_paper_files, row, parsed_path)
+        if not code_done:
+            code_future = pool.submit(_ingest_code_files, row, project_dir / "code")
+    futures = [f for f in (paper_future, code_future) if f is not None]
+
+    # Record whichever side succeeded in one UPDATE, then surface any failure.
+    values: dict[str, object] = {}
+    paper_hash = row["paper_hash"] if paper_done else None
+    repo_hash = row["repo_hash"] if code_done else None
+    if paper_future is not None and paper_future.exception() is None:
+        paper_hash = paper_future.result()
+        values.update(paper_hash=paper_hash, paper_parsed_path=str(parsed_path))
+    if code_future is not None and code_future.exception() is None:
+        repo_hash = code_future.result()
+        values.update(repo_hash=repo_hash, code_index_path=str(index_path))
+    if values:
+        values["updated_at"] = datetime.now(timezone.utc).isoformat()
+        update_project_row(project_id, values)
+        _evict_index_cache(project_id)
+    for future in futures:
+        err = future.exception()
+        if err is not None:
+            raise err
+
+    return IngestAllResponse(
         project_id=project_id,
-        repo_hash=repo_hash,
-        index_path=str(index_path),
+        paper=(
+            IngestResponse(
+                project_id=project_id,
+                paper_hash=paper_hash,
+                parsed_path=str(parsed_path),
+            )
+            if paper_hash
+            else None
+        ),
+        code=CodeIndexResponse(
+            project_id=project_id,
+            repo_hash=str(repo_hash),
+            index_path=str(index_path),
+        ),
     )
 
 
 @app.post("/projects/{project_id}/align", response_model=AlignmentResponse)
 def align_project(project_id: str) -> AlignmentResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
 
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -472,7 +717,7 @@ def align_project(project_id: str) -> AlignmentResponse:
         existing_path = Path(existing_alignment_path)
         if existing_path.exists():
             try:
-                data = json.loads(existing_path.read_text(encoding="utf-8"))
+                data = read_json(existing_path)
                 raw_count = data.get("match_count", "0")
             except json.JSONDecodeError:
                 raw_count = "0"
@@ -501,19 +746,10 @@ def align_project(project_id: str) -> AlignmentResponse:
     write_alignment(alignment_path, alignment)
 
     now = datetime.now(timezone.utc).isoformat()
-    conn = get_connection()
-    try:
-        conn.execute(
-            """
-            UPDATE projects
-            SET alignment_path = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (str(alignment_path), now, project_id),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    update_project_row(
+        project_id, {"alignment_path": str(alignment_path), "updated_at": now}
+    )
+    _evict_index_cache(project_id)
 
     raw_count = alignment.get("match_count", "0")
     if isinstance(raw_count, int):
@@ -531,13 +767,7 @@ def align_project(project_id: str) -> AlignmentResponse:
 
 @app.post("/projects/{project_id}/vector-index", response_model=VectorIndexResponse)
 def build_vector_indices(project_id: str) -> VectorIndexResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
 
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -555,32 +785,42 @@ def build_vector_indices(project_id: str) -> VectorIndexResponse:
         )
 
     paper_docs: list[dict[str, str]] = []
+    # Mirrors paper_docs one-to-one, so doc ids index straight into the store.
+    paper_excerpts: list[dict[str, str]] = []
     if parsed_path.exists():
-        paper_data = json.loads(parsed_path.read_text(encoding="utf-8"))
-        for idx, paragraph in enumerate(paper_data.get("paragraphs", [])):
+        paragraphs = iter_json_items(parsed_path, "paragraphs.item")
+        for idx, paragraph in enumerate(paragraphs):
             paper_docs.append(
                 {
                     "doc_id": f"paper:{idx}",
                     "text": str(paragraph.get("text", "")),
                 }
             )
+            paper_excerpts.append(
+                _paragraph_excerpt(
+                    paragraph.get("page", ""),
+                    paragraph.get("text", ""),
+                    str(paragraph.get("source_url", "")),
+                )
+            )
 
     paper_offset = len(paper_docs)
     for item in doc_items:
         raw_paragraphs = item.get("paragraphs", [])
         if not isinstance(raw_paragraphs, list):
             continue
+        url = str(item.get("url", ""))
         for paragraph in raw_paragraphs:
             text = str(paragraph).strip()
             if not text:
                 continue
             paper_docs.append({"doc_id": f"paper:{paper_offset}", "text": text})
+            paper_excerpts.append(_paragraph_excerpt("", text, url))
             paper_offset += 1
 
     code_docs: list[dict[str, str]] = []
     if text_index_path.exists():
-        code_data = json.loads(text_index_path.read_text(encoding="utf-8"))
-        for entry in code_data.get("entries", []):
+        for entry in iter_json_items(text_index_path, "entries.item"):
             path = str(entry.get("path", "")).strip()
             if not path:
                 continue
@@ -600,42 +840,44 @@ def build_vector_indices(project_id: str) -> VectorIndexResponse:
     if not paper_docs and not code_docs:
         raise HTTPException(status_code=400, detail="No chunkable content available")
 
+    write_paragraph_store(project_dir / "paper" / "excerpts.jsonl", paper_excerpts)
+
     paper_index_path = project_dir / "paper" / "vector_index.json"
     code_index_path = project_dir / "code" / "vector_index.json"
     paper_bm25_path = project_dir / "paper" / "bm25_index.json"
     code_bm25_path = project_dir / "code" / "bm25_index.json"
 
-    paper_index = build_vector_index(paper_docs)
-    code_index = build_vector_index(code_docs)
-    write_vector_index(paper_index_path, paper_index)
-    write_vector_index(code_index_path, code_index)
-
-    paper_bm25 = build_bm25_index(paper_docs)
-    code_bm25 = build_bm25_index(code_docs)
-    write_bm25_index(paper_bm25_path, paper_bm25)
-    write_bm25_index(code_bm25_path, code_bm25)
+    def build_vector(docs: list[dict[str, str]], path: Path) -> None:
+        cache_path = path.with_name("embedding_cache.npz")
+        write_vector_index(path, build_vector_index(docs, cache_path=cache_path))
+
+    def build_bm25(docs: list[dict[str, str]], path: Path) -> None:
+        write_bm25_index(path, build_bm25_index(docs))
+
+    # The four builds are independent. Embedding and FAISS release the GIL, so
+    # the dense builds overlap each other and the pure-Python BM25 builds.
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="index-build") as pool:
+        futures = [
+            pool.submit(build_vector, paper_docs, paper_index_path),
+            pool.submit(build_vector, code_docs, code_index_path),
+            pool.submit(build_bm25, paper_docs, paper_bm25_path),
+            pool.submit(build_bm25, code_docs, code_bm25_path),
+        ]
+        for future in futures:
+            future.result()
 
     now = datetime.now(timezone.utc).isoformat()
-    conn = get_connection()
-    try:
-        conn.execute(
-            """
-            UPDATE projects
-            SET paper_vector_path = ?, code_vector_path = ?, paper_bm25_path = ?, code_bm25_path = ?, updated_at = ?
-            WHERE id = ?
-            """,
-            (
-                str(paper_index_path),
-                str(code_index_path),
-                str(paper_bm25_path),
-                str(code_bm25_path),
-                now,
-                project_id,
-            ),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    update_project_row(
+        project_id,
+        {
+            "paper_vector_path": str(paper_index_path),
+            "code_vector_path": str(code_index_path),
+            "paper_bm25_path": str(paper_bm25_path),
+            "code_bm25_path": str(code_bm25_path),
+            "updated_at": now,
+        },
+    )
+    _evict_index_cache(project_id)
 
     return VectorIndexResponse(
         project_id=project_id,
@@ -647,14 +889,8 @@ def build_vector_indices(project_id: str) -> VectorIndexResponse:
 
 
 @app.get("/projects/{project_id}/alignment", response_model=AlignmentGetResponse)
-def get_alignment(project_id: str) -> AlignmentGetResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+def get_alignment(project_id: str) -> AlignmentGetResponse | StreamingResponse:
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
     alignment_path_value = row["alignment_path"]
@@ -667,64 +903,107 @@ def get_alignment(project_id: str) -> AlignmentGetResponse:
         return AlignmentGetResponse(
             project_id=project_id, alignment_path=str(alignment_path), alignment=None
         )
-    data = json.loads(alignment_path.read_text(encoding="utf-8"))
-    return AlignmentGetResponse(
-        project_id=project_id, alignment_path=str(alignment_path), alignment=data
+    # Pipe the stored map through untouched instead of a json.loads round trip.
+    prefix = json.dumps(
+        {"project_id": project_id, "alignment_path": str(alignment_path)},
+        ensure_ascii=True,
+    )[:-1]
+    return StreamingResponse(
+        _iter_wrapped_file(alignment_path, f'{prefix}, "alignment": '.encode(), b"}"),
+        media_type="application/json",
     )
 
 
+@app.get("/projects/{project_id}/alignment/raw")
+def get_alignment_raw(project_id: str) -> FileResponse:
+    row = get_project_row(project_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    alignment_path_value = row["alignment_path"]
+    if not alignment_path_value or not Path(alignment_path_value).exists():
+        raise HTTPException(status_code=404, detail="Alignment not found")
+    # The stored map as-is; Starlette hands the file to sendfile(2) when it can.
+    return FileResponse(alignment_path_value, media_type="application/json")
+
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_wrapped_file(path: Path, prefix: bytes, suffix: bytes) -> Iterator[bytes]:
+    yield prefix
+    with path.open("rb") as handle:
+        while chunk := handle.read(_STREAM_CHUNK_SIZE):
+            yield chunk
+    yield suffix
+
+
+def _iter_json_array_from_lines(path: Path, prefix: bytes) -> Iterator[bytes]:
+    yield prefix
+    if path.exists():
+        buffer = bytearray()
+        sep = b""
+        with path.open("rb") as handle:
+            for line_no, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                # A torn append (or any corrupt line) would otherwise make the
+                # whole response invalid JSON; drop it and keep the rest.
+                try:
+                    valid = isinstance(json_loads(line), dict)
+                except ValueError:
+                    valid = False
+                if not valid:
+                    logger.warning("Skipping malformed line %d of %s", line_no, path)
+                    continue
+                buffer += sep
+                buffer += line
+                sep = b","
+                if len(buffer) >= _STREAM_CHUNK_SIZE:
+                    yield bytes(buffer)
+                    buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+    yield b"]}"
+
+
 @app.post("/projects/{project_id}/ask", response_model=AskResponse)
 def ask_project(project_id: str, payload: AskRequest) -> AskResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
 
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    focus_points = []
-    raw_focus = row["focus_points"]
-    if raw_focus:
-        try:
-            parsed = json.loads(raw_focus)
-            if isinstance(parsed, list):
-                focus_points = [str(item) for item in parsed if str(item).strip()]
-        except json.JSONDecodeError:
-            focus_points = []
+    focus_points = _parse_focus_points(row["focus_points"])
 
     now = datetime.now(timezone.utc).isoformat()
-    existing = read_qa_log(project_id)
-    for entry in existing:
+    entry = find_qa_entry(project_id, payload.question)
+    if entry is not None:
         question_text = str(entry.get("question", "")).strip()
-        if question_text.lower() == payload.question.strip().lower():
-            created_at_raw = entry.get("created_at")
-            created_at = str(created_at_raw) if created_at_raw else now
-            raw_confidence = entry.get("confidence", 0.0)
-            if isinstance(raw_confidence, (int, float)):
+        created_at_raw = entry.get("created_at")
+        created_at = str(created_at_raw) if created_at_raw else now
+        raw_confidence = entry.get("confidence", 0.0)
+        if isinstance(raw_confidence, (int, float)):
+            confidence = float(raw_confidence)
+        elif isinstance(raw_confidence, str):
+            try:
                 confidence = float(raw_confidence)
-            elif isinstance(raw_confidence, str):
-                try:
-                    confidence = float(raw_confidence)
-                except ValueError:
-                    confidence = 0.0
-            else:
+            except ValueError:
                 confidence = 0.0
-            return AskResponse(
-                project_id=project_id,
-                question=question_text or payload.question,
-                answer=str(entry.get("answer", "")),
-                confidence=confidence,
-                created_at=datetime.fromisoformat(created_at),
-            )
+        else:
+            confidence = 0.0
+        return AskResponse(
+            project_id=project_id,
+            question=question_text or payload.question,
+            answer=str(entry.get("answer", "")),
+            confidence=confidence,
+            created_at=datetime.fromisoformat(created_at),
+        )
     project_dir = ensure_project_dirs(project_id)
     route, evidence, evidence_mix, insufficient_evidence = _build_routed_evidence(
         project_dir=project_dir,
         question=payload.question,
-        focus_points=focus_points,
+        focus_text=_focus_text(row, focus_points),
         alignment_path=str(row["alignment_path"] or ""),
     )
     llm_question = _with_llm_context(
@@ -779,72 +1058,73 @@ def ask_project(project_id: str, payload: AskRequest) -> AskResponse:
 
 @app.post("/projects/{project_id}/ask-stream")
 def ask_project_stream(project_id: str, payload: AskRequest) -> StreamingResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
 
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    focus_points = []
-    raw_focus = row["focus_points"]
-    if raw_focus:
-        try:
-            parsed = json.loads(raw_focus)
-            if isinstance(parsed, list):
-                focus_points = [str(item) for item in parsed if str(item).strip()]
-        except json.JSONDecodeError:
-            focus_points = []
+    focus_points = _parse_focus_points(row["focus_points"])
 
     project_dir = ensure_project_dirs(project_id)
     route, evidence, evidence_mix, insufficient_evidence = _build_routed_evidence(
         project_dir=project_dir,
         question=payload.question,
-        focus_points=focus_points,
+        focus_text=_focus_text(row, focus_points),
         alignment_path=str(row["alignment_path"] or ""),
     )
     llm_question = _with_llm_context(
         payload.question, route, evidence_mix, insufficient_evidence
     )
 
-    def stream_generator():
+    def finish(answer: str) -> list[dict[str, object]]:
+        now = datetime.now(timezone.utc).isoformat()
+        code_refs = _extract_code_refs_for_question(
+            evidence, question=payload.question, project_dir=project_dir
+        )
+        entry = {
+            "question": payload.question,
+            "answer": answer,
+            "evidence": evidence,
+            "route": route,
+            "evidence_mix": evidence_mix,
+            "insufficient_evidence": insufficient_evidence,
+            "code_refs": code_refs,
+            "confidence": 0.6,
+            "created_at": now,
+        }
+        append_qa_log(project_id, entry)
+        append_project_summary(
+            project_id, [f"Q: {payload.question}", f"A: {answer}", "---"]
+        )
+        return code_refs
+
+    async def stream_generator():
         answer_parts = []
         try:
-            for chunk in generate_answer_stream(
-                llm_question,
-                evidence,
-                focus_points=focus_points or None,
+            async for chunk in _iterate_in_thread(
+                generate_answer_stream(
+                    llm_question,
+                    evidence,
+                    focus_points=focus_points or None,
+                )
             ):
                 answer_parts.append(chunk)
-                yield f"data: {json.dumps({'chunk': chunk}, ensure_ascii=False)}\n\n"
+                yield _sse({"chunk": chunk})
 
             answer = "".join(answer_parts)
-            now = datetime.now(timezone.utc).isoformat()
-            code_refs = _extract_code_refs_for_question(
-                evidence, question=payload.question, project_dir=project_dir
-            )
-            entry = {
-                "question": payload.question,
-                "answer": answer,
-                "evidence": evidence,
-                "route": route,
-                "evidence_mix": evidence_mix,
-                "insufficient_evidence": insufficient_evidence,
-                "code_refs": code_refs,
-                "confidence": 0.6,
-                "created_at": now,
-            }
-            append_qa_log(project_id, entry)
-            append_project_summary(
-                project_id, [f"Q: {payload.question}", f"A: {answer}", "---"]
+            code_refs = await asyncio.to_thread(finish, answer)
+            yield _sse(
+                {
+                    "done": True,
+                    "answer": answer,
+                    "code_refs": code_refs,
+                    "route": route,
+                    "evidence_mix": evidence_mix,
+                    "insufficient_evidence": insufficient_evidence,
+                }
             )
-            yield f"data: {json.dumps({'done': True, 'answer': answer, 'code_refs': code_refs, 'route': route, 'evidence_mix': evidence_mix, 'insufficient_evidence': insufficient_evidence}, ensure_ascii=False)}\n\n"
         except LLMError as err:
-            yield f"data: {json.dumps({'error': str(err)}, ensure_ascii=False)}\n\n"
+            yield _sse({"error": str(err)})
 
     return StreamingResponse(
         stream_generator(),
@@ -857,113 +1137,159 @@ def ask_project_stream(project_id: str, payload: AskRequest) -> StreamingRespons
     )
 
 
+def _sse(payload: dict[str, object]) -> bytes:
+    return b"data: " + json_dumps(payload) + b"\n\n"
+
+
+_STREAM_DONE = object()
+
+
+async def _iterate_in_thread(iterator: Iterator[str]) -> AsyncIterator[str]:
+    """Drain a blocking iterator from one worker thread onto the event loop."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[object] = asyncio.Queue()
+    stop = threading.Event()
+
+    def pump() -> None:
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except BaseException as err:
+            loop.call_soon_threadsafe(queue.put_nowait, err)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_DONE)
+
+    loop.run_in_executor(None, pump)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+
+
+_ROUTE_CODE_MARKERS = (
+    "代码",
+    "源码",
+    "实现",
+    "函数",
+    "类",
+    "接口",
+    "路径",
+    "文件",
+    "前端",
+    "后端",
+    "code",
+    "repo",
+    "repository",
+    "file",
+    "files",
+    "filepath",
+    "path",
+    "function",
+    "class",
+    "module",
+    "import",
+    "endpoint",
+    "api",
+    "fastapi",
+    "frontend",
+    "backend",
+    "typescript",
+    "react",
+    "implementation",
+    "where is",
+    "which file",
+)
+_ROUTE_PAPER_MARKERS = (
+    "论文",
+    "摘要",
+    "引言",
+    "方法",
+    "实验",
+    "结果",
+    "结论",
+    "贡献",
+    "局限",
+    "限制",
+    "数据集",
+    "训练",
+    "超参数",
+    "消融",
+    "paper",
+    "section",
+    "figure",
+    "table",
+    "equation",
+    "theorem",
+    "lemma",
+    "proof",
+    "appendix",
+    "abstract",
+    "introduction",
+    "method",
+    "experiment",
+    "results",
+    "dataset",
+    "hyperparameter",
+    "ablation",
+    "arxiv",
+)
+# Routing only needs to know whether each side matched at all, so one unanchored
+# alternation per side (scanned once) is equivalent to testing every marker with
+# `in`. No \b anchors: the CJK markers occur inside runs of word characters.
+_ROUTE_CODE_RE = re.compile(
+    "|".join(map(re.escape, _ROUTE_CODE_MARKERS))
+    # Code-ish syntax indicators and source file extensions.
+    + r"|/|::|\(|`|\.(?:py|ts|tsx|js|jsx|md|json|yaml|yml|toml)\b"
+)
+_ROUTE_PAPER_RE = re.compile("|".join(map(re.escape, _ROUTE_PAPER_MARKERS)))
+
+
+@lru_cache(maxsize=2048)
 def _route_question(question: str) -> str:
     q = question.strip().lower()
     if not q:
         return "fallback"
 
-    code_markers = [
-        "代码",
-        "源码",
-        "实现",
-        "函数",
-        "类",
-        "接口",
-        "路径",
-        "文件",
-        "前端",
-        "后端",
-        "code",
-        "repo",
-        "repository",
-        "file",
-        "files",
-        "filepath",
-        "path",
-        "function",
-        "class",
-        "module",
-        "import",
-        "endpoint",
-        "api",
-        "fastapi",
-        "frontend",
-        "backend",
-        "typescript",
-        "react",
-        "implementation",
-        "where is",
-        "which file",
-    ]
-    paper_markers = [
-        "论文",
-        "摘要",
-        "引言",
-        "方法",
-        "实验",
-        "结果",
-        "结论",
-        "贡献",
-        "局限",
-        "限制",
-        "数据集",
-        "训练",
-        "超参数",
-        "消融",
-        "paper",
-        "section",
-        "figure",
-        "table",
-        "equation",
-        "theorem",
-        "lemma",
-        "proof",
-        "appendix",
-        "abstract",
-        "introduction",
-        "method",
-        "experiment",
-        "results",
-        "dataset",
-        "hyperparameter",
-        "ablation",
-        "arxiv",
-    ]
+    has_code = _ROUTE_CODE_RE.search(q) is not None
+    has_paper = _ROUTE_PAPER_RE.search(q) is not None
 
-    code_score = 0
-    paper_score = 0
-    for m in code_markers:
-        if m in q:
-            code_score += 1
-    for m in paper_markers:
-        if m in q:
-            paper_score += 1
-
-    # Code-ish syntax indicators.
-    if "/" in question or "::" in question or "(" in question or "`" in question:
-        code_score += 1
-    if re.search(r"\.(py|ts|tsx|js|jsx|md|json|yaml|yml|toml)\b", q):
-        code_score += 2
-
-    if paper_score >= 1 and code_score == 0:
+    if has_paper and not has_code:
         return "paper_only"
-    if code_score >= 1 and paper_score == 0:
+    if has_code and not has_paper:
         return "code_only"
-    if paper_score > 0 and code_score > 0:
+    if has_paper and has_code:
         return "hybrid"
     return "fallback"
 
 
-def _tokenize_query(text: str) -> list[str]:
-    raw = re.findall(r"[A-Za-z][A-Za-z0-9_]+", text)
-    tokens = [tok.lower() for tok in raw if len(tok) >= 3]
-    for run in re.findall(r"[\u4e00-\u9fff]+", text):
+# Length filter folded into the pattern. Matches are lower-cased after the
+# regex runs, as bm25_index does: lowering first would turn non-ASCII letters
+# such as the Kelvin sign into ASCII ones and yield tokens the index never has.
+_QUERY_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9_]{2,}")
+_HAN_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+
+
+@lru_cache(maxsize=2048)
+def _tokenize_query(text: str) -> tuple[str, ...]:
+    tokens = [token.lower() for token in _QUERY_TOKEN_RE.findall(text)]
+    for run in _HAN_RUN_RE.findall(text):
         if len(run) == 1:
             tokens.append(run)
         else:
             for idx in range(len(run) - 1):
                 tokens.append(run[idx : idx + 2])
-    return tokens
+    return tuple(tokens)
 
 
 def _with_llm_context(
@@ -971,10 +1297,25 @@ def _with_llm_context(
     route: str,
     evidence_mix: dict[str, object],
     insufficient_evidence: bool,
+) -> str:
+    return _llm_context(
+        question,
+        route,
+        evidence_mix.get("paper_pct"),
+        evidence_mix.get("code_pct"),
+        bool(insufficient_evidence),
+    )
+
+
+@lru_cache(maxsize=2048)
+def _llm_context(
+    question: str,
+    route: str,
+    paper_pct: object,
+    code_pct: object,
+    insufficient_evidence: bool,
 ) -> str:
     mix_str = ""
-    paper_pct = evidence_mix.get("paper_pct")
-    code_pct = evidence_mix.get("code_pct")
     if paper_pct is not None and code_pct is not None:
         mix_str = f"paper={paper_pct}% code={code_pct}%"
     return (
@@ -986,82 +1327,175 @@ def _with_llm_context(
     )
 
 
-def _evidence_text(item: dict[str, object]) -> str:
-    parts: list[str] = []
-    for key in ("path", "name", "doc_id", "excerpt", "text_excerpt"):
-        val = item.get(key)
-        if val:
-            parts.append(str(val))
-    return "\n".join(parts)
+_EVIDENCE_TEXT_KEYS = ("path", "name", "doc_id", "excerpt", "text_excerpt")
 
 
-def _filter_evidence_by_relevance(
-    evidence: list[dict[str, object]], query_text: str
-) -> list[dict[str, object]]:
+def _evidence_blob(item: dict[str, object]) -> bytes:
+    """Lower-cased UTF-8 text of the item's searchable fields.
+
+    Query tokens are ASCII [a-z0-9_] runs or CJK bigrams (no case), so ASCII-only
+    bytes.lower() matches them the same as str.lower() and skips Unicode case
+    mapping; UTF-8 is self-synchronizing, so byte and str substring hits agree.
+    """
+    get = item.get
+    text = "\n".join([str(val) for key in _EVIDENCE_TEXT_KEYS if (val := get(key))])
+    return text.encode("utf-8", "surrogatepass").lower()
+
+
+def _finalize_evidence(
+    items: list[dict[str, object]], query_text: str
+) -> tuple[list[dict[str, object]], dict[str, object]]:
+    """Dedup, relevance-filter and count evidence kinds in a single pass.
+
+    Returns the kept evidence and its paper/code mix. When nothing passes the
+    relevance filter, the first three unique items are kept instead so the
+    answer is never built on empty evidence solely due to filtering.
+    """
+    is_relevant = _relevance_matcher(query_text)
+    # One NUL-separated composite string per item instead of a 6-tuple of strs:
+    # a single allocation whose hash is computed once.
+    seen: set[str] = set()
+    kept: list[dict[str, object]] = []
+    head: list[dict[str, object]] = []
+    paper = 0
+    for item in items:
+        get = item.get
+        key = (
+            f"{get('kind', '')}\x00{get('path', '')}\x00{get('line', '')}\x00"
+            f"{get('name', '')}\x00{get('paragraph_index', '')}\x00{get('doc_id', '')}"
+        )
+        if key in seen:
+            continue
+        seen.add(key)
+        if len(head) < 3:
+            head.append(item)
+        if is_relevant is None or is_relevant(item):
+            kept.append(item)
+            if str(get("kind", "")).startswith("paper"):
+                paper += 1
+    if not kept:
+        kept = head
+        paper = sum(1 for item in head if str(item.get("kind", "")).startswith("paper"))
+    return kept, _evidence_mix(paper, len(kept))
+
+
+def _relevance_matcher(
+    query_text: str,
+) -> Callable[[dict[str, object]], bool] | None:
     tokens = set(_tokenize_query(query_text))
     if not tokens:
-        return evidence
+        return None
+
+    # One scan per item instead of one substring search per token. The lookahead
+    # tries every position and the longest-first alternation reports the longest
+    # token starting there; any token hidden by a longer match is a substring of
+    # it, so closing the hits over `contained` counts exactly the tokens present.
+    # Token sets are bitmasks (bit i = ordered[i]): OR to union, popcount to count.
+    ordered = sorted((tok.encode("utf-8") for tok in tokens), key=len, reverse=True)
+    token_re = re.compile(b"(?=(" + b"|".join(map(re.escape, ordered)) + b"))")
+    contained = {
+        tok: sum(1 << bit for bit, other in enumerate(ordered) if other in tok)
+        for tok in ordered
+    }
 
     def _keep(item: dict[str, object]) -> bool:
-        text = _evidence_text(item).lower()
-        if not text:
+        blob = _evidence_blob(item)
+        if not blob:
             return False
-        overlap = 0
-        for tok in tokens:
-            if tok in text:
-                overlap += 1
+        found = 0
+        for hit in set(token_re.findall(blob)):
+            found |= contained[hit]
+        overlap = found.bit_count()
         if len(tokens) <= 3:
             return overlap >= 1
         ratio = overlap / max(len(tokens), 1)
         return overlap >= 2 or ratio >= 0.12
 
-    kept = [ev for ev in evidence if _keep(ev)]
-    # Avoid returning empty evidence solely due to filtering.
-    return kept if kept else evidence[:3]
+    return _keep
 
 
-def _compute_evidence_mix(evidence: list[dict[str, object]]) -> dict[str, object]:
-    paper = 0
-    code = 0
-    for item in evidence:
-        kind = str(item.get("kind", ""))
-        if kind.startswith("paper"):
-            paper += 1
-        elif kind.startswith("code") or kind in {"symbol", "file"}:
-            code += 1
-        else:
-            # Default unknown evidence kinds to code-ish.
-            code += 1
-    total = paper + code
+def _evidence_mix(paper: int, total: int) -> dict[str, object]:
+    # Everything that is not paper evidence (code, symbol, file, unknown kinds)
+    # counts as code.
+    code = total - paper
     paper_pct = int(round((paper / total) * 100)) if total else 0
     code_pct = 100 - paper_pct if total else 0
     return {
-        "paper_count": paper,
-        "code_count": code,
-        "total": total,
-        "paper_pct": paper_pct,
-        "code_pct": code_pct,
+        "paper_count": paper,
+        "code_count": code,
+        "total": total,
+        "paper_pct": paper_pct,
+        "code_pct": code_pct,
+    }
+
+
+_PARAGRAPH_EXCERPT_CHARS = 240
+
+
+def _paragraph_excerpt(page: object, text: object, source_url: str) -> dict[str, str]:
+    """What the ask path shows for a paragraph: its page, source and a prefix."""
+    return {
+        "page": str(page),
+        "excerpt": str(text)[:_PARAGRAPH_EXCERPT_CHARS],
+        "source_url": source_url,
     }
 
 
-def _load_paper_paragraphs(project_dir: Path) -> list[dict[str, object]]:
-    out: list[dict[str, object]] = []
+def _load_paper_excerpts(project_dir: Path) -> Sequence[dict[str, str]]:
+    parsed_path = project_dir / "paper" / "parsed.json"
+    docs_path = project_dir / "docs" / "parsed.json"
+    store_path = project_dir / "paper" / "excerpts.jsonl"
+    paths = (parsed_path, docs_path, store_path, paragraph_offsets_path(store_path))
+    return _load_cached(
+        project_dir.name,
+        "paper_excerpts",
+        paths,
+        lambda: _open_paper_excerpts(project_dir, paths),
+    )
+
+
+def _open_paper_excerpts(
+    project_dir: Path, paths: tuple[Path, ...]
+) -> Sequence[dict[str, str]]:
+    # The JSONL store written with the vector index only parses the excerpts an
+    # ask actually cites. Fall back to parsed.json when the sources are newer.
+    *source_paths, store_path, offsets_file = paths
+    store_stamp = _file_stamp(offsets_file)
+    if store_stamp is not None and all(
+        stamp is None or stamp[0] <= store_stamp[0]
+        for stamp in map(_file_stamp, source_paths)
+    ):
+        store = open_paragraph_store(store_path)
+        if store is not None:
+            return store
+    return tuple(_read_paper_excerpts(project_dir))
+
+
+def _read_paper_excerpts(project_dir: Path) -> list[dict[str, str]]:
+    # Only excerpts are kept, so full paragraph bodies never stay resident.
+    out: list[dict[str, str]] = []
     parsed_path = project_dir / "paper" / "parsed.json"
     if parsed_path.exists():
         try:
-            paper_data = json.loads(parsed_path.read_text(encoding="utf-8"))
+            paper_data = read_json(parsed_path)
             raw_paragraphs = paper_data.get("paragraphs", [])
             if isinstance(raw_paragraphs, list):
                 for paragraph in raw_paragraphs:
                     if isinstance(paragraph, dict):
-                        out.append(paragraph)
+                        out.append(
+                            _paragraph_excerpt(
+                                paragraph.get("page", ""),
+                                paragraph.get("text", ""),
+                                str(paragraph.get("source_url", "")),
+                            )
+                        )
         except (OSError, json.JSONDecodeError):
             pass
 
     docs_path = project_dir / "docs" / "parsed.json"
     if docs_path.exists():
         try:
-            doc_data = json.loads(docs_path.read_text(encoding="utf-8"))
+            doc_data = read_json(docs_path)
             items = doc_data.get("items", []) if isinstance(doc_data, dict) else []
             if isinstance(items, list):
                 for item in items:
@@ -1075,7 +1509,7 @@ def _load_paper_paragraphs(project_dir: Path) -> list[dict[str, object]]:
                         text = str(para).strip()
                         if not text:
                             continue
-                        out.append({"page": "", "text": text, "source_url": url})
+                        out.append(_paragraph_excerpt("", text, url))
         except (OSError, json.JSONDecodeError):
             pass
 
@@ -1084,11 +1518,20 @@ def _load_paper_paragraphs(project_dir: Path) -> list[dict[str, object]]:
 
 def _load_code_chunks(project_dir: Path) -> dict[str, dict[str, object]]:
     text_index_path = project_dir / "code" / "text_index.json"
+    return _load_cached(
+        project_dir.name,
+        "code_chunks",
+        (text_index_path,),
+        lambda: _read_code_chunks(text_index_path),
+    )
+
+
+def _read_code_chunks(text_index_path: Path) -> dict[str, dict[str, object]]:
     if not text_index_path.exists():
         return {}
     out: dict[str, dict[str, object]] = {}
     try:
-        code_data = json.loads(text_index_path.read_text(encoding="utf-8"))
+        code_data = read_json(text_index_path)
         for entry in code_data.get("entries", []):
             path = str(entry.get("path", "")).strip()
             excerpt = str(entry.get("excerpt", ""))
@@ -1117,50 +1560,180 @@ def _load_code_chunks(project_dir: Path) -> dict[str, dict[str, object]]:
     return out
 
 
+def _load_retrieval_indices(
+    project_dir: Path, want_paper: bool, want_code: bool
+) -> dict[str, dict[str, object]]:
+    jobs: dict[str, tuple[Callable[[Path], dict[str, object]], Path]] = {}
+    if want_paper:
+        paper_dir = project_dir / "paper"
+        jobs["paper_vector"] = (load_vector_index, paper_dir / "vector_index.json")
+        jobs["paper_bm25"] = (load_bm25_index, paper_dir / "bm25_index.json")
+    if want_code:
+        code_dir = project_dir / "code"
+        jobs["code_vector"] = (load_vector_index, code_dir / "vector_index.json")
+        jobs["code_bm25"] = (load_bm25_index, code_dir / "bm25_index.json")
+    jobs = {name: job for name, job in jobs.items() if job[1].exists()}
+    project_id = project_dir.name
+    if len(jobs) <= 1:
+        return {
+            name: _load_index_cached(project_id, name, loader, path)
+            for name, (loader, path) in jobs.items()
+        }
+
+    # Submit every read up front so the file reads and JSON parses overlap.
+    futures = {
+        name: _INDEX_IO_POOL.submit(_load_index_cached, project_id, name, loader, path)
+        for name, (loader, path) in jobs.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _query_retrieval_index(
+    project_id: str,
+    kind: str,
+    loader: Callable[[Path], dict[str, object]],
+    query: Callable[..., list[tuple[str, float]]],
+    path: Path,
+    query_text: str,
+) -> list[tuple[str, float]]:
+    if not path.exists():
+        return []
+    index = _load_index_cached(project_id, kind, loader, path)
+    return query(index, query_text, top_k=5)
+
+
+def _load_alignment_evidence(
+    project_id: str, alignment_path: str
+) -> list[dict[str, object]]:
+    alignment_file = Path(alignment_path)
+    if not alignment_file.exists():
+        return []
+    try:
+        return _load_cached(
+            project_id,
+            "alignment_evidence",
+            (alignment_file,),
+            lambda: _collect_evidence(read_json(alignment_file)),
+        )
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+def _load_index_cached(
+    project_id: str,
+    kind: str,
+    loader: Callable[[Path], dict[str, object]],
+    path: Path,
+) -> dict[str, object]:
+    if not path.exists():
+        return {}
+    return _load_cached(project_id, kind, (path,), lambda: loader(path))
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _load_cached(
+    project_id: str, kind: str, paths: tuple[Path, ...], build: Callable[[], Any]
+) -> Any:
+    stamp = tuple(_file_stamp(path) for path in paths)
+    key = (project_id, kind)
+    with _index_cache_lock:
+        cached = _index_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            _index_cache.move_to_end(key)
+            return cached[1]
+    data = build()
+    with _index_cache_lock:
+        _index_cache[key] = (stamp, data)
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return data
+
+
+def _evict_index_cache(project_id: str) -> None:
+    # Entries are stamp-checked, so this is not needed for correctness: it frees
+    # a deleted or rebuilt project's old indices now instead of at LRU eviction.
+    with _index_cache_lock:
+        for key in [key for key in _index_cache if key[0] == project_id]:
+            del _index_cache[key]
+
+
+def _warm_index_cache(project_id: str) -> None:
+    project_dir = PROJECTS_DIR / project_id
+    try:
+        _load_retrieval_indices(project_dir, want_paper=True, want_code=True)
+    except Exception:
+        # Best effort: the next ask retries the load, but say why it failed now.
+        logger.exception("Failed to warm index cache for project %s", project_id)
+
+
 def _build_routed_evidence(
     project_dir: Path,
     question: str,
-    focus_points: list[str],
+    focus_text: str,
     alignment_path: str,
 ) -> tuple[str, list[dict[str, object]], dict[str, object], bool]:
     route = _route_question(question)
 
     query_text = question
-    if focus_points:
-        query_text = query_text + "\n\nFocus points: " + ", ".join(focus_points)
-
-    paper_paragraphs = _load_paper_paragraphs(project_dir)
-    code_chunks = _load_code_chunks(project_dir)
+    if focus_text:
+        query_text = query_text + "\n\nFocus points: " + focus_text
 
     want_paper = route in {"paper_only", "hybrid", "fallback"}
     want_code = route in {"code_only", "hybrid", "fallback"}
 
+    # Every load and index query below is independent: run them side by side so
+    # a cold ask costs the slowest branch rather than the sum of all of them.
+    project_id = project_dir.name
+    jobs: dict[str, Callable[[], Any]] = {
+        "paper_excerpts": lambda: _load_paper_excerpts(project_dir),
+        "code_chunks": lambda: _load_code_chunks(project_dir),
+    }
+    for side, wanted in (("paper", want_paper), ("code", want_code)):
+        if not wanted:
+            continue
+        side_dir = project_dir / side
+        jobs[f"{side}_vector"] = partial(
+            _query_retrieval_index,
+            project_id,
+            f"{side}_vector",
+            load_vector_index,
+            query_vector_index,
+            side_dir / "vector_index.json",
+            query_text,
+        )
+        jobs[f"{side}_bm25"] = partial(
+            _query_retrieval_index,
+            project_id,
+            f"{side}_bm25",
+            load_bm25_index,
+            query_bm25_index,
+            side_dir / "bm25_index.json",
+            query_text,
+        )
     # Alignment evidence is treated as auxiliary signal (only for hybrid).
-    alignment_evidence: list[dict[str, object]] = []
     if route == "hybrid" and alignment_path:
-        alignment_file = Path(alignment_path)
-        if alignment_file.exists():
-            try:
-                alignment = json.loads(alignment_file.read_text(encoding="utf-8"))
-                alignment_evidence = _collect_evidence(alignment)
-            except (OSError, json.JSONDecodeError):
-                alignment_evidence = []
+        jobs["alignment"] = lambda: _load_alignment_evidence(project_id, alignment_path)
+
+    futures = {name: _INDEX_IO_POOL.submit(job) for name, job in jobs.items()}
+    results = {name: future.result() for name, future in futures.items()}
+    paper_excerpts = results["paper_excerpts"]
+    code_chunks = results["code_chunks"]
+    alignment_evidence: list[dict[str, object]] = results.get("alignment", [])
 
     evidence: list[dict[str, object]] = []
 
     paper_evidence: list[dict[str, object]] = []
     if want_paper:
-        paper_vector_path = project_dir / "paper" / "vector_index.json"
-        paper_vec_matches: list[tuple[str, float]] = []
-        if paper_vector_path.exists():
-            paper_index = load_vector_index(paper_vector_path)
-            paper_vec_matches = query_vector_index(paper_index, query_text, top_k=5)
-
-        paper_bm25_path = project_dir / "paper" / "bm25_index.json"
-        paper_bm25_matches: list[tuple[str, float]] = []
-        if paper_bm25_path.exists():
-            paper_bm25 = load_bm25_index(paper_bm25_path)
-            paper_bm25_matches = query_bm25_index(paper_bm25, query_text, top_k=5)
+        paper_vec_matches = results["paper_vector"]
+        paper_bm25_matches = results["paper_bm25"]
 
         for doc_id, score in _rrf_fuse(
             [("tfidf", paper_vec_matches), ("bm25", paper_bm25_matches)],
@@ -1170,46 +1743,34 @@ def _build_routed_evidence(
             ev["kind"] = "paper_hybrid"
             ev["doc_id"] = doc_id
             ev["score"] = score
-            if isinstance(doc_id, str) and doc_id.startswith("paper:"):
-                raw_idx = doc_id.split(":", 1)[1]
-                if raw_idx.isdigit():
-                    idx = int(raw_idx)
-                    if 0 <= idx < len(paper_paragraphs):
-                        paragraph = paper_paragraphs[idx]
-                        ev["paragraph_index"] = str(idx)
-                        ev["page"] = str(paragraph.get("page", ""))
-                        source_url = str(paragraph.get("source_url", "")).strip()
-                        if source_url:
-                            ev["source_url"] = source_url
-                        ev["text_excerpt"] = str(paragraph.get("text", ""))[:240]
+            idx = _paper_doc_index(doc_id)
+            if 0 <= idx < len(paper_excerpts):
+                excerpt = paper_excerpts[idx]
+                ev["paragraph_index"] = str(idx)
+                ev["page"] = excerpt.get("page", "")
+                source_url = excerpt.get("source_url", "").strip()
+                if source_url:
+                    ev["source_url"] = source_url
+                ev["text_excerpt"] = excerpt.get("excerpt", "")
             paper_evidence.append(ev)
 
-    if not paper_evidence and paper_paragraphs:
-        for idx, paragraph in enumerate(paper_paragraphs[:3]):
+    if not paper_evidence and paper_excerpts:
+        for idx, excerpt in enumerate(paper_excerpts[:3]):
             ev = {
                 "kind": "paper_fallback",
                 "doc_id": f"paper:{idx}",
                 "score": 0.0,
                 "paragraph_index": str(idx),
-                "page": str(paragraph.get("page", "")),
-                "source_url": str(paragraph.get("source_url", "")),
-                "text_excerpt": str(paragraph.get("text", ""))[:240],
+                "page": excerpt.get("page", ""),
+                "source_url": excerpt.get("source_url", ""),
+                "text_excerpt": excerpt.get("excerpt", ""),
             }
             paper_evidence.append(ev)
 
     code_evidence: list[dict[str, object]] = []
     if want_code:
-        code_vector_path = project_dir / "code" / "vector_index.json"
-        code_vec_matches: list[tuple[str, float]] = []
-        if code_vector_path.exists():
-            code_index = load_vector_index(code_vector_path)
-            code_vec_matches = query_vector_index(code_index, query_text, top_k=5)
-
-        code_bm25_path = project_dir / "code" / "bm25_index.json"
-        code_bm25_matches: list[tuple[str, float]] = []
-        if code_bm25_path.exists():
-            code_bm25 = load_bm25_index(code_bm25_path)
-            code_bm25_matches = query_bm25_index(code_bm25, query_text, top_k=5)
+        code_vec_matches = results["code_vector"]
+        code_bm25_matches = results["code_bm25"]
 
         for doc_id, score in _rrf_fuse(
             [("tfidf", code_vec_matches), ("bm25", code_bm25_matches)],
@@ -1220,13 +1781,12 @@ def _build_routed_evidence(
                 "doc_id": doc_id,
                 "score": score,
             }
-            if isinstance(doc_id, str) and doc_id.startswith("code:"):
-                meta = code_chunks.get(doc_id)
-                if not meta:
-                    rel = doc_id.split(":", 1)[1]
-                    if "#" in rel:
-                        rel = rel.split("#", 1)[0]
-                    meta = code_chunks.get(f"code:{rel}")
+            if doc_id.startswith("code:"):
+                # Chunk ids are "code:<path>#<start>-<end>"; fall back to the
+                # whole-file id "code:<path>" without re-splitting the string.
+                meta = code_chunks.get(doc_id) or code_chunks.get(
+                    doc_id.partition("#")[0]
+                )
                 if meta:
                     ev["path"] = str(meta.get("path", ""))
                     start_line = meta.get("start_line")
@@ -1262,35 +1822,41 @@ def _build_routed_evidence(
 
     # Cap alignment contribution (aux signal): at most 2 items.
     if alignment_evidence:
-        evidence.extend(alignment_evidence[:2])
+        evidence.extend(dict(item) for item in alignment_evidence[:2])
 
-    evidence = _dedup_evidence(evidence)
-    evidence = _filter_evidence_by_relevance(evidence, query_text)
-    evidence_mix = _compute_evidence_mix(evidence)
+    evidence, evidence_mix = _finalize_evidence(evidence, query_text)
     insufficient = bool(not evidence)
     return route, evidence, evidence_mix, insufficient
 
-    return StreamingResponse(
-        stream_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
-    )
-
 
 def _collect_evidence(alignment: dict[str, object]) -> list[dict[str, object]]:
-    limit = 20
-    # heap items are compared lexicographically; include a monotonic counter so ties
-    # on (score, paragraph_confidence) never fall back to comparing dict entries.
-    heap: list[tuple[tuple[int, float], int]] = []
-    entries_by_id: dict[int, dict[str, object]] = {}
-    counter = itertools.count()
+    # Rank bare (score, confidence, match, item) tuples and only build entry dicts
+    # for the winners. nlargest is stable on equal keys, so ties keep file order.
+    top = heapq.nlargest(20, _iter_alignment_matches(alignment), key=itemgetter(0, 1))
+    return [
+        {
+            "paragraph_index": item.get("paragraph_index"),
+            "page": item.get("page"),
+            "text_excerpt": item.get("text_excerpt"),
+            "paragraph_confidence": paragraph_confidence,
+            "kind": match.get("kind"),
+            "path": match.get("path"),
+            "name": match.get("name"),
+            "line": match.get("line"),
+            "score": score,
+            "matched_tokens": match.get("matched_tokens"),
+            "excerpt": match.get("excerpt"),
+        }
+        for score, paragraph_confidence, match, item in top
+    ]
+
+
+def _iter_alignment_matches(
+    alignment: dict[str, object],
+) -> Iterator[tuple[int, float, dict[str, object], dict[str, object]]]:
     raw_results = alignment.get("results", [])
     if not isinstance(raw_results, list):
-        return []
+        return
 
     for item in raw_results:
         if not isinstance(item, dict):
@@ -1298,6 +1864,16 @@ def _collect_evidence(alignment: dict[str, object]) -> list[dict[str, object]]:
         raw_matches = item.get("matches", [])
         if not isinstance(raw_matches, list):
             continue
+        raw_conf = item.get("confidence", "0")
+        if isinstance(raw_conf, str):
+            try:
+                paragraph_confidence = float(raw_conf)
+            except ValueError:
+                paragraph_confidence = 0.0
+        elif isinstance(raw_conf, (int, float)):
+            paragraph_confidence = float(raw_conf)
+        else:
+            paragraph_confidence = 0.0
         for match in raw_matches:
             if not isinstance(match, dict):
                 continue
@@ -1308,83 +1884,40 @@ def _collect_evidence(alignment: dict[str, object]) -> list[dict[str, object]]:
                 score = int(raw_score)
             else:
                 score = 0
-            raw_conf = item.get("confidence", "0")
-            if isinstance(raw_conf, str):
-                try:
-                    paragraph_confidence = float(raw_conf)
-                except ValueError:
-                    paragraph_confidence = 0.0
-            elif isinstance(raw_conf, (int, float)):
-                paragraph_confidence = float(raw_conf)
-            else:
-                paragraph_confidence = 0.0
-            entry: dict[str, object] = {
-                "paragraph_index": item.get("paragraph_index"),
-                "page": item.get("page"),
-                "text_excerpt": item.get("text_excerpt"),
-                "paragraph_confidence": paragraph_confidence,
-                "kind": match.get("kind"),
-                "path": match.get("path"),
-                "name": match.get("name"),
-                "line": match.get("line"),
-                "score": score,
-                "matched_tokens": match.get("matched_tokens"),
-                "excerpt": match.get("excerpt"),
-            }
-            key = (score, paragraph_confidence)
-            entry_id = next(counter)
-            entries_by_id[entry_id] = entry
-            if len(heap) < limit:
-                heapq.heappush(heap, (key, entry_id))
-            else:
-                popped_key, popped_id = heapq.heappushpop(heap, (key, entry_id))
-                if popped_id != entry_id:
-                    entries_by_id.pop(popped_id, None)
-                else:
-                    entries_by_id.pop(entry_id, None)
-
-    top: list[dict[str, object]] = []
-    for _, entry_id in sorted(heap, key=lambda pair: pair[0], reverse=True):
-        try:
-            top.append(entries_by_id[entry_id])
-        except KeyError:
-            continue
-    return top
+            yield score, paragraph_confidence, match, item
 
 
-def _dedup_evidence(items: list[dict[str, object]]) -> list[dict[str, object]]:
-    seen = set()
-    out: list[dict[str, object]] = []
-    for item in items:
-        kind = str(item.get("kind", ""))
-        key = (
-            kind,
-            str(item.get("path", "")),
-            str(item.get("line", "")),
-            str(item.get("name", "")),
-            str(item.get("paragraph_index", "")),
-            str(item.get("doc_id", "")),
-        )
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(item)
-    return out
+def _paper_doc_index(doc_id: str) -> int:
+    """Paragraph index encoded in a "paper:<n>" doc id, or -1."""
+    if doc_id.startswith("paper:"):
+        raw_idx = doc_id[6:]
+        if raw_idx.isdigit():
+            return int(raw_idx)
+    return -1
+
+
+_RRF_K = 60
+# 1 / (_RRF_K + rank) for ranks 1.._RRF_TABLE_SIZE; index 0 is unused.
+_RRF_TABLE_SIZE = 64
+_RRF_INV = (0.0, *(1.0 / (_RRF_K + rank) for rank in range(1, _RRF_TABLE_SIZE + 1)))
 
 
 def _rrf_fuse(
     ranked_lists: list[tuple[str, list[tuple[str, float]]]],
     top_k: int,
-    rrf_k: int = 60,
+    rrf_k: int = _RRF_K,
 ) -> list[tuple[str, float]]:
     scores: dict[str, float] = {}
     for _, matches in ranked_lists:
+        if rrf_k == _RRF_K and len(matches) <= _RRF_TABLE_SIZE:
+            weights = _RRF_INV
+        else:
+            weights = (0.0, *(1.0 / (rrf_k + r) for r in range(1, len(matches) + 1)))
         for rank, (doc_id, _) in enumerate(matches, start=1):
             if not doc_id:
                 continue
-            scores[doc_id] = scores.get(doc_id, 0.0) + (1.0 / (rrf_k + rank))
-    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-    return ranked[:top_k]
+            scores[doc_id] = scores.get(doc_id, 0.0) + weights[rank]
+    return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
 
 
 def _extract_code_refs(evidence: list[dict[str, object]]) -> list[dict[str, object]]:
@@ -1419,41 +1952,12 @@ def _derive_line_number_from_excerpt(file_content: str, excerpt: str) -> int:
     return 0
 
 
-def _extract_code_refs_for_question(
-    evidence: list[dict[str, object]],
-    question: str,
-    project_dir: Path | None,
-    target_refs: int = 3,
-    max_refs: int = 5,
-) -> list[dict[str, object]]:
-    def _coerce_line(value: object) -> int:
-        if isinstance(value, int) and value > 0:
-            return value
-        if isinstance(value, str) and value.isdigit():
-            parsed = int(value)
-            return parsed if parsed > 0 else 1
-        return 1
-
-    def _make_ref(path: str, line: int, name: str) -> dict[str, object]:
-        line_num = line if line > 0 else 1
-        return {
-            "path": path,
-            "line": line_num,
-            "name": name,
-            "start_line": max(1, line_num - 5),
-            "end_line": line_num + 15,
-        }
-
-    def _make_file_ref(path: str) -> dict[str, object]:
-        return {
-            "path": path,
-            "line": 1,
-            "name": "",
-            "start_line": 1,
-            "end_line": 50,
-        }
+_IDENT_SPLIT_RE = re.compile(r"[^A-Za-z0-9]+")
+_CAMEL_PART_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_QUESTION_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{1,}")
 
-    stopwords = {
+_CODE_REF_STOPWORDS = frozenset(
+    {
         "a",
         "an",
         "and",
@@ -1497,68 +2001,225 @@ def _extract_code_refs_for_question(
         "would",
         "you",
     }
+)
 
-    def _split_identifier(text: str) -> list[str]:
-        if not text:
-            return []
-        # Split underscores/dashes, then split camelCase/PascalCase.
-        parts: list[str] = []
-        for chunk in re.split(r"[^A-Za-z0-9]+", text):
-            if not chunk:
+
+def _coerce_line(value: object) -> int:
+    if isinstance(value, int) and value > 0:
+        return value
+    if isinstance(value, str) and value.isdigit():
+        parsed = int(value)
+        return parsed if parsed > 0 else 1
+    return 1
+
+
+def _make_ref(path: str, line: int, name: str) -> dict[str, object]:
+    line_num = line if line > 0 else 1
+    return {
+        "path": path,
+        "line": line_num,
+        "name": name,
+        "start_line": max(1, line_num - 5),
+        "end_line": line_num + 15,
+    }
+
+
+def _make_file_ref(path: str) -> dict[str, object]:
+    return {
+        "path": path,
+        "line": 1,
+        "name": "",
+        "start_line": 1,
+        "end_line": 50,
+    }
+
+
+def _split_identifier(text: str) -> list[str]:
+    if not text:
+        return []
+    # Split underscores/dashes, then split camelCase/PascalCase.
+    parts: list[str] = []
+    for chunk in _IDENT_SPLIT_RE.split(text):
+        if not chunk:
+            continue
+        parts.extend(p for p in _CAMEL_PART_RE.findall(chunk) if p)
+    return parts
+
+
+def _tokenize_question(text: str) -> set[str]:
+    out: set[str] = set()
+    # Preserve original casing so we can split camelCase/PascalCase.
+    for token in _QUESTION_WORD_RE.findall(text):
+        for part in _split_identifier(token):
+            low = part.lower()
+            if low in _CODE_REF_STOPWORDS:
                 continue
-            parts.extend(
-                [p for p in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+", chunk) if p]
-            )
-        return parts
-
-    def _tokenize_question(text: str) -> set[str]:
-        out: set[str] = set()
-        # Preserve original casing so we can split camelCase/PascalCase.
-        for token in re.findall(r"[A-Za-z_][A-Za-z0-9_]{1,}", text):
-            for part in _split_identifier(token):
-                low = part.lower()
-                if low in stopwords:
-                    continue
-                if len(low) < 2:
-                    continue
-                out.add(low)
-        return out
-
-    def _path_tokens(path: str) -> set[str]:
-        out: set[str] = set()
-        for part in path.replace("\\", "/").split("/"):
-            for tok in _split_identifier(part):
-                low = tok.lower()
-                if len(low) >= 2 and low not in stopwords:
-                    out.add(low)
-        return out
-
-    def _name_tokens(name: str) -> set[str]:
-        out: set[str] = set()
-        for tok in _split_identifier(name):
+            if len(low) < 2:
+                continue
+            out.add(low)
+    return out
+
+
+def _path_tokens(path: str) -> set[str]:
+    out: set[str] = set()
+    for part in path.replace("\\", "/").split("/"):
+        for tok in _split_identifier(part):
             low = tok.lower()
-            if len(low) >= 2 and low not in stopwords:
+            if len(low) >= 2 and low not in _CODE_REF_STOPWORDS:
                 out.add(low)
-        return out
+    return out
 
-    def _score_symbol(
-        sym: dict[str, object], query_tokens: set[str], boost_paths: set[str]
-    ) -> float:
+
+def _name_tokens(name: str) -> set[str]:
+    out: set[str] = set()
+    for tok in _split_identifier(name):
+        low = tok.lower()
+        if len(low) >= 2 and low not in _CODE_REF_STOPWORDS:
+            out.add(low)
+    return out
+
+
+def _build_symbol_token_index(symbols: list[dict[str, object]]) -> dict[str, object]:
+    """Precompute each symbol's name/path tokens plus a token -> ids map.
+
+    Ids are positions in symbols.json; the symbols themselves are not repeated.
+    """
+    name_tokens: list[list[str]] = []
+    path_tokens: list[list[str]] = []
+    name_postings: dict[str, list[int]] = {}
+    path_postings: dict[str, list[int]] = {}
+    for idx, sym in enumerate(symbols):
         path = str(sym.get("path", ""))
         name = str(sym.get("name", ""))
-        if not path or not name:
-            return 0.0
-        name_toks = _name_tokens(name)
-        path_toks = _path_tokens(path)
-        if not name_toks and not path_toks:
-            return 0.0
-        overlap_name = len(query_tokens & name_toks)
-        overlap_path = len(query_tokens & path_toks)
-        score = float(overlap_name * 2 + overlap_path)
-        if path in boost_paths:
-            score += 3.0
-        return score
+        # Symbols without a path or name never score, so they get no tokens.
+        name_toks = sorted(_name_tokens(name)) if path and name else []
+        path_toks = sorted(_path_tokens(path)) if path and name else []
+        name_tokens.append(name_toks)
+        path_tokens.append(path_toks)
+        for token in name_toks:
+            name_postings.setdefault(token, []).append(idx)
+        for token in path_toks:
+            path_postings.setdefault(token, []).append(idx)
+    return {
+        "name_tokens": name_tokens,
+        "path_tokens": path_tokens,
+        "name_postings": name_postings,
+        "path_postings": path_postings,
+    }
+
+
+def _write_symbol_token_index(path: Path, symbols: list[dict[str, object]]) -> None:
+    path.write_text(
+        json.dumps(
+            _build_symbol_token_index(symbols),
+            ensure_ascii=True,
+            separators=(",", ":"),
+        ),
+        encoding="utf-8",
+    )
+
+
+def _load_symbol_token_index(project_dir: Path) -> dict[str, Any]:
+    symbols_path = project_dir / "code" / "symbols.json"
+    tokens_path = project_dir / "code" / "symbols_tokens.json"
+    return _load_cached(
+        project_dir.name,
+        "symbol_tokens",
+        (symbols_path, tokens_path),
+        lambda: _read_symbol_token_index(symbols_path, tokens_path),
+    )
+
+
+def _read_symbols(symbols_path: Path) -> list[dict[str, object]]:
+    try:
+        raw_symbols = read_json(symbols_path).get("symbols", [])
+    except (OSError, json.JSONDecodeError):
+        return []
+    if not isinstance(raw_symbols, list):
+        return []
+    return [item for item in raw_symbols if isinstance(item, dict)]
+
+
+def _read_symbol_token_index(symbols_path: Path, tokens_path: Path) -> dict[str, Any]:
+    symbols = _read_symbols(symbols_path)
+    raw: Any = None
+    symbols_stamp = _file_stamp(symbols_path)
+    tokens_stamp = _file_stamp(tokens_path)
+    if (
+        symbols
+        and symbols_stamp is not None
+        and tokens_stamp is not None
+        and symbols_stamp[0] <= tokens_stamp[0]
+    ):
+        try:
+            raw = read_json(tokens_path)
+        except (OSError, json.JSONDecodeError):
+            raw = None
+    if not isinstance(raw, dict) or len(raw.get("name_tokens", ())) != len(symbols):
+        # Indexed before symbols_tokens.json existed (or it is stale): build it
+        # in memory from symbols.json.
+        raw = _build_symbol_token_index(symbols)
+
+    path_to_ids: dict[str, list[int]] = {}
+    for idx, sym in enumerate(symbols):
+        path_to_ids.setdefault(str(sym.get("path", "")), []).append(idx)
+    return {
+        "symbols": symbols,
+        # Only whether a symbol has any tokens matters once postings exist.
+        "has_tokens": [
+            bool(name_toks or path_toks)
+            for name_toks, path_toks in zip(raw["name_tokens"], raw["path_tokens"])
+        ],
+        "name_postings": raw["name_postings"],
+        "path_postings": raw["path_postings"],
+        "path_to_ids": path_to_ids,
+    }
+
+
+def _rank_symbols(
+    token_index: dict[str, Any],
+    query_tokens: set[str],
+    boost_paths: set[str],
+    only_boosted: bool,
+) -> list[tuple[float, int]]:
+    """Heap of (-score, symbol id) over the symbols that score above zero.
+
+    Scores accumulate straight off the postings (+2 per shared name token, +1
+    per shared path token, +3 for a boosted path), so only symbols that match
+    are ever touched and no per-symbol set intersection is built. Popping
+    yields the order of a stable descending sort by score.
+    """
+    has_tokens = token_index["has_tokens"]
+    path_to_ids = token_index["path_to_ids"]
+    boosted = {
+        idx
+        for path in boost_paths
+        for idx in path_to_ids.get(path, ())
+        if has_tokens[idx]
+    }
+    scores = dict.fromkeys(boosted, 3)
+    name_postings = token_index["name_postings"]
+    path_postings = token_index["path_postings"]
+    for token in query_tokens:
+        for idx in name_postings.get(token, ()):
+            if not only_boosted or idx in boosted:
+                scores[idx] = scores.get(idx, 0) + 2
+        for idx in path_postings.get(token, ()):
+            if not only_boosted or idx in boosted:
+                scores[idx] = scores.get(idx, 0) + 1
+
+    ranked = [(-float(score), idx) for idx, score in scores.items()]
+    heapq.heapify(ranked)
+    return ranked
+
 
+def _extract_code_refs_for_question(
+    evidence: list[dict[str, object]],
+    question: str,
+    project_dir: Path | None,
+    target_refs: int = 3,
+    max_refs: int = 5,
+) -> list[dict[str, object]]:
     refs: list[dict[str, object]] = []
     seen: set[tuple[str, int, str]] = set()
 
@@ -1593,42 +2254,18 @@ def _extract_code_refs_for_question(
     query_tokens = _tokenize_question(question)
     scored_added = 0
     if len(refs) < target_refs and project_dir is not None and query_tokens:
-        symbols_path = project_dir / "code" / "symbols.json"
-        symbols: list[dict[str, object]] = []
-        try:
-            if symbols_path.exists():
-                data = json.loads(symbols_path.read_text(encoding="utf-8"))
-                raw_symbols = data.get("symbols", [])
-                if isinstance(raw_symbols, list):
-                    for item in raw_symbols:
-                        if isinstance(item, dict):
-                            symbols.append(item)
-        except (OSError, json.JSONDecodeError):
-            symbols = []
-
-        def _rank(
-            candidates: list[dict[str, object]],
-        ) -> list[tuple[float, dict[str, object]]]:
-            ranked: list[tuple[float, dict[str, object]]] = []
-            for sym in candidates:
-                score = _score_symbol(sym, query_tokens, evidence_paths)
-                if score <= 0:
-                    continue
-                ranked.append((score, sym))
-            ranked.sort(key=lambda pair: pair[0], reverse=True)
-            return ranked
-
+        token_index = _load_symbol_token_index(project_dir)
+        symbols = token_index["symbols"]
         ranked = []
         if evidence_paths:
-            ranked = _rank(
-                [s for s in symbols if str(s.get("path", "")) in evidence_paths]
-            )
+            ranked = _rank_symbols(token_index, query_tokens, evidence_paths, True)
         if not ranked:
-            ranked = _rank(symbols)
+            ranked = _rank_symbols(token_index, query_tokens, evidence_paths, False)
 
-        for _, sym in ranked:
+        while ranked:
             if len(refs) >= max_refs or len(refs) >= target_refs:
                 break
+            sym = symbols[heapq.heappop(ranked)[1]]
             path = str(sym.get("path", ""))
             if not path:
                 continue
@@ -1689,20 +2326,36 @@ def _extract_code_refs_for_question(
 def _parse_focus_points(raw_focus: str | None) -> list[str]:
     if not raw_focus:
         return []
+    return list(_decode_focus_points(raw_focus))
+
+
+# Keyed by the column's JSON text: every ask/overview call on a project passes
+# the same (row-cached) value, so the decode happens once per distinct list.
+@lru_cache(maxsize=1024)
+def _decode_focus_points(raw_focus: str) -> tuple[str, ...]:
     try:
-        parsed = json.loads(raw_focus)
+        parsed = json_loads(raw_focus)
         if isinstance(parsed, list):
-            return [str(item) for item in parsed if str(item).strip()]
+            return tuple(str(item) for item in parsed if str(item).strip())
     except json.JSONDecodeError:
-        return []
-    return []
+        return ()
+    return ()
+
+
+def _focus_text(row, focus_points: list[str]) -> str:
+    # focus_points_joined is precomputed at create time; rows created before the
+    # column existed fall back to joining the parsed list.
+    joined = row["focus_points_joined"]
+    if joined is not None:
+        return str(joined)
+    return ", ".join(focus_points)
 
 
 def _parse_doc_urls(raw_doc_urls: str | None) -> list[str]:
     if not raw_doc_urls:
         return []
     try:
-        parsed = json.loads(raw_doc_urls)
+        parsed = json_loads(raw_doc_urls)
         if isinstance(parsed, list):
             out: list[str] = []
             for item in parsed:
@@ -1724,7 +2377,7 @@ def _load_or_build_doc_parsed(
 
     if docs_path.exists():
         try:
-            cached = json.loads(docs_path.read_text(encoding="utf-8"))
+            cached = read_json(docs_path)
             cached_urls = cached.get("urls", []) if isinstance(cached, dict) else []
             cached_items = cached.get("items", []) if isinstance(cached, dict) else []
             if isinstance(cached_urls, list) and isinstance(cached_items, list):
@@ -1790,7 +2443,7 @@ def _detect_language_from_path(rel_path: str) -> str:
     }.get(suffix, "text")
 
 
-def _read_repo_text_file(repo_dir: Path, rel_path: str) -> str:
+def _resolve_repo_file(repo_dir: Path, rel_path: str) -> Path:
     repo_root = repo_dir.resolve()
     abs_path = (repo_dir / rel_path).resolve()
     try:
@@ -1799,15 +2452,24 @@ def _read_repo_text_file(repo_dir: Path, rel_path: str) -> str:
         raise HTTPException(status_code=400, detail="Invalid path")
     if not abs_path.exists() or not abs_path.is_file():
         raise HTTPException(status_code=404, detail="File not found")
+    return abs_path
+
+
+def _read_repo_text_file(repo_dir: Path, rel_path: str) -> str:
+    abs_path = _resolve_repo_file(repo_dir, rel_path)
     try:
-        return abs_path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        try:
-            return abs_path.read_bytes().decode("utf-8", errors="replace")
-        except OSError as err:
-            raise HTTPException(status_code=500, detail=f"Failed to read file: {err}")
+        data = abs_path.read_bytes()
     except OSError as err:
         raise HTTPException(status_code=500, detail=f"Failed to read file: {err}")
+    # One read: a non-UTF-8 file is re-decoded with replacement, not re-read.
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("utf-8", errors="replace")
+    # Same universal-newline translation read_text applied.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
 
 def _read_readme(repo_dir: Path) -> str:
@@ -1822,6 +2484,9 @@ def _read_readme(repo_dir: Path) -> str:
     return ""
 
 
+_ARXIV_ID_RE = re.compile(r"^[A-Za-z0-9._/-]+(v\d+)?$")
+
+
 def _extract_arxiv_id(paper_url: str) -> str:
     try:
         parsed = urlparse(paper_url)
@@ -1846,38 +2511,88 @@ def _extract_arxiv_id(paper_url: str) -> str:
         return ""
 
     # Permit both new-style (2101.00001v2) and old-style (cs/9901001) IDs.
-    if not re.match(r"^[A-Za-z0-9._/-]+(v\d+)?$", arxiv_id):
+    if not _ARXIV_ID_RE.match(arxiv_id):
         return ""
     return arxiv_id
 
 
+_ATOM_SUMMARY_TAG = "{http://www.w3.org/2005/Atom}summary"
+# Keep-alive session for export.arxiv.org, so repeat fetches skip TCP+TLS setup.
+_arxiv_http = requests.Session()
+# arXiv id -> abstract, shared across projects that cite the same paper.
+_ARXIV_ABSTRACT_CACHE_SIZE = 512
+_arxiv_abstracts: OrderedDict[str, str] = OrderedDict()
+_arxiv_abstracts_lock = threading.Lock()
+
+
 def _fetch_arxiv_abstract(paper_url: str) -> str:
     arxiv_id = _extract_arxiv_id(paper_url)
     if not arxiv_id:
         return ""
 
+    # Feed the response into a pull parser as it arrives and stop at the first
+    # <summary>: no full-body str copy, no DOM, and the rest is never read.
+    parser = ET.XMLPullParser(events=("end",))
     try:
-        res = requests.get(
+        with _arxiv_http.get(
             "https://export.arxiv.org/api/query",
             params={"id_list": arxiv_id},
             timeout=10,
-        )
-        res.raise_for_status()
-    except requests.RequestException:
+            stream=True,
+        ) as res:
+            res.raise_for_status()
+            for chunk in res.iter_content(chunk_size=8192):
+                parser.feed(chunk)
+                for _, elem in parser.read_events():
+                    if elem.tag == _ATOM_SUMMARY_TAG:
+                        abstract = " ".join(str(elem.text or "").split()).strip()
+                        return abstract[:2000]
+    except (requests.RequestException, ET.ParseError):
         return ""
+    return ""
 
-    try:
-        root = ET.fromstring(res.text)
-    except ET.ParseError:
-        return ""
 
-    ns = {"atom": "http://www.w3.org/2005/Atom"}
-    entry = root.find("atom:entry", ns)
-    if entry is None:
+def _cached_arxiv_abstract(project_dir: Path, paper_url: str) -> str:
+    """_fetch_arxiv_abstract, memoized in process by arXiv id (shared across
+    projects) and on disk per project (surviving restarts)."""
+    arxiv_id = _extract_arxiv_id(paper_url)
+    if not arxiv_id:
         return ""
-    summary = entry.findtext("atom:summary", default="", namespaces=ns)
-    abstract = " ".join(str(summary).split()).strip()
-    return abstract[:2000]
+    with _arxiv_abstracts_lock:
+        abstract = _arxiv_abstracts.get(arxiv_id)
+        if abstract is not None:
+            _arxiv_abstracts.move_to_end(arxiv_id)
+            return abstract
+
+    cache_path = project_dir / "paper" / "arxiv_abstract.json"
+    try:
+        cached = read_json(cache_path)
+        if isinstance(cached, dict) and cached.get("arxiv_id") == arxiv_id:
+            abstract = str(cached.get("abstract", ""))
+            if abstract:
+                _remember_arxiv_abstract(arxiv_id, abstract)
+                return abstract
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    abstract = _fetch_arxiv_abstract(paper_url)
+    if abstract:
+        # Failures are not cached, so the next generation retries the fetch.
+        _remember_arxiv_abstract(arxiv_id, abstract)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(cache_path, {"arxiv_id": arxiv_id, "abstract": abstract})
+        except OSError:
+            pass
+    return abstract
+
+
+def _remember_arxiv_abstract(arxiv_id: str, abstract: str) -> None:
+    with _arxiv_abstracts_lock:
+        _arxiv_abstracts[arxiv_id] = abstract
+        _arxiv_abstracts.move_to_end(arxiv_id)
+        while len(_arxiv_abstracts) > _ARXIV_ABSTRACT_CACHE_SIZE:
+            _arxiv_abstracts.popitem(last=False)
 
 
 def _normalize_lang(raw_lang: str | None) -> str:
@@ -1891,13 +2606,7 @@ def _normalize_lang(raw_lang: str | None) -> str:
 
 @app.get("/projects/{project_id}/overview", response_model=OverviewResponse)
 def get_project_overview(project_id: str) -> OverviewResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT id FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -1923,13 +2632,7 @@ def get_project_overview(project_id: str) -> OverviewResponse:
 def generate_project_overview_quick(
     project_id: str, lang: str | None = Query(None)
 ) -> StreamingResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -1940,10 +2643,10 @@ def generate_project_overview_quick(
     paper_abstract = ""
     paper_url = str(row["paper_url"])
     if _extract_arxiv_id(paper_url):
-        paper_abstract = _fetch_arxiv_abstract(paper_url)
+        paper_abstract = _cached_arxiv_abstract(project_dir, paper_url)
     if not paper_abstract and parsed_path.exists():
         try:
-            parsed = json.loads(parsed_path.read_text(encoding="utf-8"))
+            parsed = read_json(parsed_path)
             paragraphs = parsed.get("paragraphs", [])
             if isinstance(paragraphs, list) and paragraphs:
                 paper_abstract = str(paragraphs[0].get("text", ""))[:2000]
@@ -1954,26 +2657,30 @@ def generate_project_overview_quick(
     focus_points = _parse_focus_points(row["focus_points"])
     overview_lang = _normalize_lang(lang)
 
-    def stream_generator():
+    async def stream_generator():
         parts: list[str] = []
         try:
-            for chunk in generate_overview_stream(
-                project_name=str(row["name"]),
-                paper_url=str(row["paper_url"]),
-                repo_url=str(row["repo_url"]),
-                readme_content=readme_content,
-                paper_abstract=paper_abstract,
-                focus_points=focus_points or None,
-                lang=overview_lang,
+            async for chunk in _iterate_in_thread(
+                generate_overview_stream(
+                    project_name=str(row["name"]),
+                    paper_url=str(row["paper_url"]),
+                    repo_url=str(row["repo_url"]),
+                    readme_content=readme_content,
+                    paper_abstract=paper_abstract,
+                    focus_points=focus_points or None,
+                    lang=overview_lang,
+                )
             ):
                 parts.append(chunk)
-                yield f"data: {json.dumps({'chunk': chunk}, ensure_ascii=False)}\n\n"
+                yield _sse({"chunk": chunk})
 
             content = "".join(parts)
-            write_project_overview(project_id, content, version="quick")
-            yield f"data: {json.dumps({'done': True, 'content': content}, ensure_ascii=False)}\n\n"
+            await asyncio.to_thread(
+                write_project_overview, project_id, content, version="quick"
+            )
+            yield _sse({"done": True, "content": content})
         except LLMError as err:
-            yield f"data: {json.dumps({'error': str(err)}, ensure_ascii=False)}\n\n"
+            yield _sse({"error": str(err)})
 
     return StreamingResponse(
         stream_generator(),
@@ -1986,17 +2693,18 @@ def generate_project_overview_quick(
     )
 
 
+# How much of the paper and symbol index the full-overview prompt takes (mirrors
+# the slices in llm._build_overview_full_prompt).
+_OVERVIEW_MAX_PARAGRAPHS = 20
+_OVERVIEW_MAX_CLASSES = 10
+_OVERVIEW_MAX_FUNCTIONS = 15
+
+
 @app.post("/projects/{project_id}/overview/generate-full")
 def generate_project_overview_full(
     project_id: str, lang: str | None = Query(None)
 ) -> StreamingResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT * FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -2013,61 +2721,87 @@ def generate_project_overview_full(
     focus_points = _parse_focus_points(row["focus_points"])
     overview_lang = _normalize_lang(lang)
 
+    # The prompt only uses the first 20 paragraphs and the first 10 classes / 15
+    # functions, so stream both files and stop reading once those are filled.
     paper_paragraphs: list[str] = []
     try:
-        parsed = json.loads(parsed_path.read_text(encoding="utf-8"))
-        raw_paragraphs = parsed.get("paragraphs", [])
-        if isinstance(raw_paragraphs, list):
-            for item in raw_paragraphs:
-                if isinstance(item, dict) and str(item.get("text", "")).strip():
-                    paper_paragraphs.append(str(item.get("text", "")))
-    except (json.JSONDecodeError, OSError):
+        for item in iter_json_items(parsed_path, "paragraphs.item"):
+            if isinstance(item, dict) and str(item.get("text", "")).strip():
+                paper_paragraphs.append(str(item.get("text", "")))
+                if len(paper_paragraphs) >= _OVERVIEW_MAX_PARAGRAPHS:
+                    break
+    except (OSError, *JSON_ERRORS):
         paper_paragraphs = []
 
     code_symbols: list[dict[str, str]] = []
     try:
-        sym_data = json.loads(symbols_path.read_text(encoding="utf-8"))
-        raw_symbols = sym_data.get("symbols", [])
-        if isinstance(raw_symbols, list):
-            for item in raw_symbols:
-                if isinstance(item, dict):
-                    path = item.get("path")
-                    typ = item.get("type")
-                    name = item.get("name")
-                    line = item.get("line")
-                    if path and typ and name and line:
-                        code_symbols.append(
-                            {
-                                "path": str(path),
-                                "type": str(typ),
-                                "name": str(name),
-                                "line": str(line),
-                            }
-                        )
-    except (json.JSONDecodeError, OSError):
+        class_count = 0
+        function_count = 0
+        kept_other = False
+        for item in iter_json_items(symbols_path, "symbols.item"):
+            if not isinstance(item, dict):
+                continue
+            path = item.get("path")
+            typ = item.get("type")
+            name = item.get("name")
+            line = item.get("line")
+            if not (path and typ and name and line):
+                continue
+            if typ == "class":
+                if class_count >= _OVERVIEW_MAX_CLASSES:
+                    continue
+                class_count += 1
+            elif typ in ("def", "function"):
+                if function_count >= _OVERVIEW_MAX_FUNCTIONS:
+                    continue
+                function_count += 1
+            elif kept_other:
+                continue
+            else:
+                # The builder drops other types, but a non-empty list is what
+                # makes it render the (possibly empty) class/function sections.
+                kept_other = True
+            code_symbols.append(
+                {
+                    "path": str(path),
+                    "type": str(typ),
+                    "name": str(name),
+                    "line": str(line),
+                }
+            )
+            if (
+                class_count >= _OVERVIEW_MAX_CLASSES
+                and function_count >= _OVERVIEW_MAX_FUNCTIONS
+            ):
+                break
+    except (OSError, *JSON_ERRORS):
         code_symbols = []
 
-    def stream_generator():
+    async def stream_generator():
         parts: list[str] = []
         try:
-            for chunk in generate_overview_full_stream(
-                project_name=str(row["name"]),
-                paper_url=str(row["paper_url"]),
-                repo_url=str(row["repo_url"]),
-                readme_content=readme_content,
-                paper_paragraphs=paper_paragraphs,
-                code_symbols=code_symbols,
-                focus_points=focus_points or None,
-                lang=overview_lang,
+            async for chunk in _iterate_in_thread(
+                generate_overview_full_stream(
+                    project_name=str(row["name"]),
+                    paper_url=str(row["paper_url"]),
+                    repo_url=str(row["repo_url"]),
+                    readme_content=readme_content,
+                    paper_paragraphs=paper_paragraphs,
+                    code_symbols=code_symbols,
+                    focus_points=focus_points or None,
+                    lang=overview_lang,
+                )
             ):
                 parts.append(chunk)
-                yield f"data: {json.dumps({'chunk': chunk}, ensure_ascii=False)}\n\n"
+                yield _sse({"chunk": chunk})
 
             content = "".join(parts)
-            write_project_overview(project_id, content, version="full")
-            yield f"data: {json.dumps({'done': True, 'content': content}, ensure_ascii=False)}\n\n"
+            await asyncio.to_thread(
+                write_project_overview, project_id, content, version="full"
+            )
+            yield _sse({"done": True, "content": content})
         except LLMError as err:
-            yield f"data: {json.dumps({'error': str(err)}, ensure_ascii=False)}\n\n"
+            yield _sse({"error": str(err)})
 
     return StreamingResponse(
         stream_generator(),
@@ -2084,13 +2818,7 @@ def generate_project_overview_full(
 def get_code_file(
     project_id: str, path: str = Query(..., min_length=1)
 ) -> CodeFileResponse:
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT id FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -2117,13 +2845,7 @@ def get_code_snippet(
     if end_line < start_line:
         raise HTTPException(status_code=400, detail="end_line must be >= start_line")
 
-    conn = get_connection()
-    try:
-        row = conn.execute(
-            "SELECT id FROM projects WHERE id = ?", (project_id,)
-        ).fetchone()
-    finally:
-        conn.close()
+    row = get_project_row(project_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -2131,16 +2853,32 @@ def get_code_snippet(
     if not repo_dir.exists():
         raise HTTPException(status_code=400, detail="Run code index first")
 
-    full = _read_repo_text_file(repo_dir, path)
-    lines = full.splitlines()
+    # Decode lines only up to end_line and keep only the requested range, instead
+    # of reading and splitting the whole file.
+    abs_path = _resolve_repo_file(repo_dir, path)
+    lines: list[str] = []
+    line_no = 0
+    try:
+        with abs_path.open("r", encoding="utf-8", errors="replace") as handle:
+            for physical in handle:
+                # The code index numbers lines with str.splitlines(), which also
+                # breaks on form feeds and other Unicode separators; count the same.
+                for line in physical.splitlines():
+                    line_no += 1
+                    if line_no >= start_line:
+                        lines.append(line)
+                if line_no >= end_line:
+                    break
+    except OSError as err:
+        raise HTTPException(status_code=500, detail=f"Failed to read file: {err}")
+    del lines[end_line - start_line + 1 :]
 
-    total_lines = len(lines)
-    if start_line > total_lines:
+    if not lines:
         raise HTTPException(status_code=400, detail="start_line out of bounds")
-    if end_line > total_lines:
-        end_line = total_lines
+    # Fewer lines than asked for means the file ended first: clamp end_line.
+    end_line = start_line + len(lines) - 1
 
-    content = "\n".join(lines[start_line - 1 : end_line])
+    content = "\n".join(lines)
     return CodeSnippetResponse(
         project_id=project_id,
         path=path,
@@ -0,0 +1,78 @@
+import json
+from array import array
+from pathlib import Path
+from typing import Iterable, Sequence, overload
+
+from .jsonio import loads
+
+# Byte offsets of each line start plus the end of file, as native uint64.
+_OFFSET_TYPECODE = "Q"
+
+
+def offsets_path(path: Path) -> Path:
+    return path.with_suffix(".offsets")
+
+
+def write_paragraph_store(path: Path, paragraphs: Iterable[dict[str, object]]) -> int:
+    """Write paragraphs as JSONL plus a binary line-offset table; return the count."""
+    offsets = array(_OFFSET_TYPECODE, [0])
+    with path.open("wb") as handle:
+        for paragraph in paragraphs:
+            line = json.dumps(paragraph, ensure_ascii=True).encode("utf-8") + b"\n"
+            handle.write(line)
+            offsets.append(offsets[-1] + len(line))
+    with offsets_path(path).open("wb") as handle:
+        offsets.tofile(handle)
+    return len(offsets) - 1
+
+
+def open_paragraph_store(path: Path) -> "ParagraphStore | None":
+    """Load the offset table for path, or None if either file is missing/torn."""
+    try:
+        raw = offsets_path(path).read_bytes()
+        size = path.stat().st_size
+    except OSError:
+        return None
+    offsets = array(_OFFSET_TYPECODE)
+    if not raw or len(raw) % offsets.itemsize:
+        return None
+    offsets.frombytes(raw)
+    if offsets[0] != 0 or offsets[-1] != size:
+        return None
+    return ParagraphStore(path, offsets)
+
+
+class ParagraphStore(Sequence[dict[str, object]]):
+    """Read-only paragraph list that parses only the lines actually indexed."""
+
+    def __init__(self, path: Path, offsets: array) -> None:
+        self.path = path
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, object]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, object]]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> dict[str, object] | list[dict[str, object]]:
+        if isinstance(index, slice):
+            return [self._read(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("paragraph index out of range")
+        return self._read(index)
+
+    def _read(self, index: int) -> dict[str, object]:
+        start = self._offsets[index]
+        with self.path.open("rb") as handle:
+            handle.seek(start)
+            line = handle.read(self._offsets[index + 1] - start)
+        paragraph = loads(line)
+        return paragraph if isinstance(paragraph, dict) else {}
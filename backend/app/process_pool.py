@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers() -> int:
+    """Worker count for CPU-bound pools: one per core, capped at 8."""
+    return min(os.cpu_count() or 1, 8)
+
+
+def _spawn_pool(max_workers: int) -> ProcessPoolExecutor:
+    # spawn, not fork: the API process is multi-threaded.
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+class LazyProcessPool:
+    """A spawn-context process pool started on first use.
+
+    Workers are expensive to start, so one pool is kept for the life of the API
+    process; shutdown() drops it (the next get() starts a fresh one), which is
+    also how callers recover from a BrokenProcessPool.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._max_workers = max_workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = _spawn_pool(self._max_workers or default_workers())
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
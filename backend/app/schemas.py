@@ -52,6 +52,12 @@ class CodeIndexResponse(BaseModel):
     index_path: str
 
 
+class IngestAllResponse(BaseModel):
+    project_id: str
+    paper: IngestResponse | None
+    code: CodeIndexResponse
+
+
 class AlignmentResponse(BaseModel):
     project_id: str
     alignment_path: str
@@ -1,8 +1,12 @@
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Iterable, List, Mapping
+from typing import Iterable, Iterator, Mapping
+from uuid import uuid4
 
 from .config import PROJECTS_DIR
+from .jsonio import loads, read_json
 
 
 def ensure_project_dirs(project_id: str) -> Path:
@@ -16,10 +20,24 @@ def ensure_project_dirs(project_id: str) -> Path:
     return project_dir
 
 
+def write_json_atomic(path: Path, data: object) -> None:
+    """Write data as indented ASCII JSON via a temp file and os.replace.
+
+    Readers see either the old file or the new one, never a partial write.
+    """
+    payload = json.dumps(data, ensure_ascii=True, indent=2).encode("ascii")
+    tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+    try:
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def write_project_meta(project_id: str, meta: Mapping[str, object]) -> None:
     project_dir = ensure_project_dirs(project_id)
-    meta_path = project_dir / "project.json"
-    meta_path.write_text(json.dumps(meta, ensure_ascii=True, indent=2))
+    write_json_atomic(project_dir / "project.json", meta)
 
 
 def read_project_summary(project_id: str) -> str:
@@ -40,26 +58,89 @@ def append_project_summary(project_id: str, lines: Iterable[str]) -> None:
         handle.write("\n")
 
 
+def qa_log_path(project_id: str) -> Path:
+    return PROJECTS_DIR / project_id / "qa" / "qa_log.jsonl"
+
+
+# project_id -> ((mtime_ns, size) of qa_log.jsonl, {normalized question: entry}).
+_QA_INDEX: dict[str, tuple[tuple[int, int], dict[str, dict[str, object]]]] = {}
+_QA_INDEX_LOCK = threading.Lock()
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+def _log_stamp(log_path: Path) -> tuple[int, int] | None:
+    try:
+        stat = log_path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 def append_qa_log(project_id: str, entry: Mapping[str, object]) -> None:
-    log_path = PROJECTS_DIR / project_id / "qa" / "qa_log.jsonl"
-    log_path.parent.mkdir(parents=True, exist_ok=True)
-    with log_path.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(entry, ensure_ascii=True))
-        handle.write("\n")
+    append_qa_logs(project_id, (entry,))
 
 
-def read_qa_log(project_id: str) -> List[dict[str, object]]:
-    log_path = PROJECTS_DIR / project_id / "qa" / "qa_log.jsonl"
+def append_qa_logs(project_id: str, entries: Iterable[Mapping[str, object]]) -> None:
+    """Append entries to the QA log with a single write call."""
+    entries = list(entries)
+    if not entries:
+        return
+    # ensure_ascii output is pure ASCII, so the encode cannot fail.
+    payload = "".join(
+        json.dumps(entry, ensure_ascii=True) + "\n" for entry in entries
+    ).encode("ascii")
+    log_path = qa_log_path(project_id)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with _QA_INDEX_LOCK:
+        before = _log_stamp(log_path)
+        with log_path.open("ab") as handle:
+            handle.write(payload)
+        cached = _QA_INDEX.get(project_id)
+        if cached is None or cached[0] != before:
+            _QA_INDEX.pop(project_id, None)
+            return
+        after = _log_stamp(log_path)
+        if after is None:
+            _QA_INDEX.pop(project_id, None)
+            return
+        index = cached[1]
+        for entry in entries:
+            key = normalize_question(str(entry.get("question", "")))
+            index.setdefault(key, dict(entry))
+        _QA_INDEX[project_id] = (after, index)
+
+
+def find_qa_entry(project_id: str, question: str) -> dict[str, object] | None:
+    """Return the first logged entry asking the same question, if any."""
+    log_path = qa_log_path(project_id)
+    with _QA_INDEX_LOCK:
+        stamp = _log_stamp(log_path)
+        if stamp is None:
+            _QA_INDEX.pop(project_id, None)
+            return None
+        cached = _QA_INDEX.get(project_id)
+        if cached is None or cached[0] != stamp:
+            index: dict[str, dict[str, object]] = {}
+            for entry in iter_qa_log(project_id):
+                key = normalize_question(str(entry.get("question", "")))
+                index.setdefault(key, entry)
+            cached = (stamp, index)
+            _QA_INDEX[project_id] = cached
+        return cached[1].get(normalize_question(question))
+
+
+def iter_qa_log(project_id: str) -> Iterator[dict[str, object]]:
+    log_path = qa_log_path(project_id)
     if not log_path.exists():
-        return []
-    entries = []
-    with log_path.open("r", encoding="utf-8") as handle:
+        return
+    # Parse each line straight from bytes; the parser skips the trailing newline.
+    with log_path.open("rb") as handle:
         for line in handle:
-            line = line.strip()
-            if not line:
-                continue
-            entries.append(json.loads(line))
-    return entries
+            if line.strip():
+                yield loads(line)
 
 
 def read_project_overview(project_id: str) -> dict[str, object] | None:
@@ -67,7 +148,7 @@ def read_project_overview(project_id: str) -> dict[str, object] | None:
     if not overview_path.exists():
         return None
     try:
-        return json.loads(overview_path.read_text(encoding="utf-8"))
+        return read_json(overview_path)
     except (json.JSONDecodeError, OSError):
         return None
 
@@ -80,9 +161,7 @@ def write_project_overview(project_id: str, content: str, version: str) -> None:
         "version": version,
         "generated_at": datetime.now(timezone.utc).isoformat(),
     }
-    overview_path.write_text(
-        json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"
-    )
+    write_json_atomic(overview_path, data)
 
 
 def _read_readme_from_repo(repo_dir: Path) -> str:
@@ -101,7 +180,7 @@ def _read_paper_abstract(parsed_path: Path) -> str:
     if not parsed_path.exists():
         return ""
     try:
-        data = json.loads(parsed_path.read_text(encoding="utf-8"))
+        data = read_json(parsed_path)
         paragraphs = data.get("paragraphs", [])
         if paragraphs:
             first_para = paragraphs[0].get("text", "")
@@ -111,28 +190,4 @@ def _read_paper_abstract(parsed_path: Path) -> str:
     return ""
 
 
-def _get_arxiv_abstract(paper_url: str) -> str:
-    import re
-
-    match = re.search(r"arxiv\.org/abs/(\d+\.\d+)", paper_url)
-    if match:
-        arxiv_id = match.group(1)
-        try:
-            res = requests.get(
-                f"https://export.arxiv.org/api/query?id_list={arxiv_id}", timeout=10
-            )
-            if res.ok:
-                import xml.etree.ElementTree as ET
-
-                root = ET.fromstring(res.text)
-                ns = {"atom": "http://www.w3.org/2005/Atom"}
-                summary = root.find(".//atom:summary", ns)
-                if summary is not None and summary.text:
-                    return summary.text[:2000]
-        except Exception:
-            pass
-    return ""
-
-
 from datetime import datetime, timezone
-import requests
@@ -1,10 +1,15 @@
+import hashlib
 import json
 import importlib
 import math
+import operator
 import os
-import re
+import threading
+import zipfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, cast
+
+from .jsonio import read_json
 
 DEFAULT_EMBED_MODEL = os.environ.get(
     "EMBED_MODEL_NAME", "jinaai/jina-embeddings-v2-base-code"
@@ -20,9 +25,50 @@ def _faiss_use_gpu_mode() -> str:
     return "auto"
 
 
+def _vector_index_quant() -> str:
+    value = os.environ.get("VECTOR_INDEX_QUANT", "sq8").strip().lower()
+    if value in {"flat", "none", "fp32"}:
+        return "flat"
+    if value in {"binary", "bin", "1bit"}:
+        return "binary"
+    if value in {"fp16", "half", "sqfp16"}:
+        return "fp16"
+    return "sq8"
+
+
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 80
+_HNSW_EF_SEARCH = 64
+
+
+def _vector_index_hnsw_min() -> int:
+    # Corpora at least this large get an HNSW graph instead of an exhaustive scan.
+    value = _as_int(os.environ.get("VECTOR_INDEX_HNSW_MIN", "20000"))
+    return value if value > 0 else 20000
+
+
+_IVFPQ_NPROBE = 16
+_IVFPQ_SUBVECTOR_DIM = 8
+
+
+def _vector_index_ivfpq_min() -> int:
+    # Past this size even HNSW keeps every full vector in RAM; IVF-PQ stores
+    # one byte per 8 dimensions and probes only a few inverted lists.
+    value = _as_int(os.environ.get("VECTOR_INDEX_IVFPQ_MIN", "200000"))
+    return value if value > 0 else 200000
+
+
 def build_vector_index(
-    docs: list[dict[str, str]], max_terms: int = 200
+    docs: list[dict[str, str]],
+    max_terms: int = 200,
+    cache_path: Path | None = None,
 ) -> dict[str, object]:
+    """Embed docs and build the FAISS index for them.
+
+    With cache_path, embeddings of unchanged texts are reused from the previous
+    build (keyed by a BLAKE2b digest of the text) and the cache is rewritten to
+    hold exactly this build's vectors.
+    """
     del max_terms
     doc_ids = [str(doc.get("doc_id", "")) for doc in docs if str(doc.get("doc_id", ""))]
     texts = [str(doc.get("text", "")) for doc in docs if str(doc.get("doc_id", ""))]
@@ -34,8 +80,10 @@ def build_vector_index(
             "model": DEFAULT_EMBED_MODEL,
         }
 
-    embedder = _get_embedder()
-    vectors = _embed_texts(embedder, texts)
+    if cache_path is None:
+        vectors = _embed_texts(_get_embedder(), texts)
+    else:
+        vectors = _embed_texts_cached(texts, cache_path)
     if vectors.size == 0:
         return {
             "backend": "empty",
@@ -45,12 +93,24 @@ def build_vector_index(
         }
 
     dim = int(vectors.shape[1])
-    index = _build_faiss_index(vectors, dim)
+    quant = _vector_index_quant()
+    if quant == "binary" and dim % 8:
+        quant = "sq8"
+    ann = "hnsw" if len(doc_ids) >= _vector_index_hnsw_min() else "exact"
+    if quant == "binary":
+        # A popcount scan over 1-bit codes is already cheaper than graph search.
+        ann = "exact"
+    elif len(doc_ids) >= _vector_index_ivfpq_min() and not dim % _IVFPQ_SUBVECTOR_DIM:
+        ann = "ivfpq"
+        quant = "pq"
+    index = _build_faiss_index(vectors, dim, ann, quant)
     return {
         "backend": "faiss",
         "doc_ids": doc_ids,
         "dim": dim,
         "model": DEFAULT_EMBED_MODEL,
+        "quant": quant,
+        "ann": ann,
         "_faiss_index": index,
     }
 
@@ -64,17 +124,29 @@ def write_vector_index(path: Path, data: dict[str, object]) -> None:
         if index is None:
             raise RuntimeError("missing FAISS index in build result")
         faiss_path = path.with_suffix(".faiss")
-        faiss.write_index(index, str(faiss_path))
+        # Write beside and rename: readers may have the old file mmapped, and
+        # truncating it in place would fault their next page access.
+        tmp_path = faiss_path.with_name(faiss_path.name + ".tmp")
+        if data.get("quant") == "binary":
+            faiss.write_index_binary(index, str(tmp_path))
+        else:
+            faiss.write_index(index, str(tmp_path))
+        os.replace(tmp_path, faiss_path)
         manifest = {
             "backend": "faiss",
             "faiss_path": str(faiss_path),
             "doc_ids": data.get("doc_ids", []),
             "dim": _as_int(data.get("dim", 0)),
             "model": str(data.get("model", DEFAULT_EMBED_MODEL)),
+            "quant": str(data.get("quant", "flat")),
+            "ann": str(data.get("ann", "exact")),
         }
-        path.write_text(
+        # Replace, not truncate: a concurrent loader must never parse half a file.
+        tmp_manifest = path.with_name(path.name + ".tmp")
+        tmp_manifest.write_text(
             json.dumps(manifest, ensure_ascii=True, indent=2), encoding="utf-8"
         )
+        os.replace(tmp_manifest, path)
         return
 
     path.write_text(
@@ -95,7 +167,7 @@ def write_vector_index(path: Path, data: dict[str, object]) -> None:
 def load_vector_index(path: Path) -> dict[str, object]:
     if not path.exists():
         return {}
-    raw = json.loads(path.read_text(encoding="utf-8"))
+    raw = read_json(path)
     if not isinstance(raw, dict):
         return {}
     backend = str(raw.get("backend", ""))
@@ -109,11 +181,29 @@ def load_vector_index(path: Path) -> dict[str, object]:
     faiss_path = Path(faiss_path_raw)
     if not faiss_path.exists():
         raise RuntimeError(f"dense index file not found: {faiss_path}")
-    index = faiss.read_index(str(faiss_path))
+    if raw.get("quant") == "binary":
+        index = _read_faiss_index(faiss.read_index_binary, faiss, faiss_path)
+    else:
+        index = _read_faiss_index(faiss.read_index, faiss, faiss_path)
+        if raw.get("ann") == "ivfpq":
+            index.nprobe = _IVFPQ_NPROBE
     raw["_faiss_index"] = index
     return raw
 
 
+def _read_faiss_index(reader, faiss, faiss_path: Path):
+    # Map the file read-only so the page cache, not the heap, holds the codes and
+    # idle projects' pages can be dropped without writeback. Index types or
+    # builds without mmap support fall back to a regular read.
+    flags = getattr(faiss, "IO_FLAG_MMAP", 0) | getattr(faiss, "IO_FLAG_READ_ONLY", 0)
+    if flags:
+        try:
+            return reader(str(faiss_path), flags)
+        except (RuntimeError, TypeError):
+            pass
+    return reader(str(faiss_path))
+
+
 def query_vector_index(
     index: dict[str, object], question: str, top_k: int = 5
 ) -> list[tuple[str, float]]:
@@ -138,9 +228,12 @@ def query_vector_index(
 
     k = max(1, min(top_k, len(doc_ids)))
 
+    if index.get("quant") == "binary":
+        return _query_binary_index(faiss_index, doc_ids, query_vecs, k)
+
     use_gpu = False
     gpu_mode = _faiss_use_gpu_mode()
-    if gpu_mode != "0":
+    if gpu_mode != "0" and _gpu_clonable(index):
         get_num_gpus = getattr(faiss, "get_num_gpus", None)
         if callable(get_num_gpus):
             try:
@@ -151,32 +244,18 @@ def query_vector_index(
             raise RuntimeError("FAISS_USE_GPU=1 but no FAISS GPU is available")
 
     search_index = faiss_index
-    if use_gpu:
+    # A clone that already failed in auto mode is not retried on every query.
+    if use_gpu and not index.get("_gpu_clone_failed"):
         cached_gpu = index.get("_faiss_index_gpu")
         if cached_gpu is None:
-            cpu_to_gpu = getattr(faiss, "index_cpu_to_gpu", None)
-            resources_cls = getattr(faiss, "StandardGpuResources", None)
-            if not callable(cpu_to_gpu) or resources_cls is None:
-                if gpu_mode == "1":
-                    raise RuntimeError("FAISS GPU APIs not available in this build")
-            else:
-                try:
-                    res = resources_cls()
-                    gpu_index = cpu_to_gpu(res, 0, faiss_index)
-                    index["_faiss_gpu_res"] = res
-                    index["_faiss_index_gpu"] = gpu_index
-                    cached_gpu = gpu_index
-                except Exception:
-                    if gpu_mode == "1":
-                        raise
-                    cached_gpu = None
+            cached_gpu = _clone_to_gpu(faiss, index, faiss_index, gpu_mode)
         if cached_gpu is not None:
             search_index = cached_gpu
 
     search_fn = getattr(search_index, "search", None)
     if not callable(search_fn):
         raise RuntimeError("invalid FAISS index object")
-    raw_result = search_fn(query_vecs, k)
+    raw_result = _search_into_scratch(search_fn, query_vecs, k, "float32")
     if not isinstance(raw_result, tuple) or len(raw_result) != 2:
         raise RuntimeError("invalid FAISS search result")
     distances = raw_result[0]
@@ -194,17 +273,185 @@ def query_vector_index(
     return out
 
 
-def _build_faiss_index(vectors, dim: int):
+def _gpu_clonable(index: dict[str, object]) -> bool:
+    """Whether index_cpu_to_gpu can clone this index type.
+
+    FAISS GPU covers IndexFlatIP and the IVF family only: flat scalar-quantized
+    (sq8/fp16) and HNSW indices have no GPU version, so they always search on
+    CPU, even with FAISS_USE_GPU=1.
+    """
+    # Manifests from before quantization carry neither key: exact + flat.
+    ann = index.get("ann", "exact")
+    return ann == "ivfpq" or (ann == "exact" and index.get("quant", "flat") == "flat")
+
+
+_gpu_lock = threading.Lock()
+_gpu_resources = None
+
+
+def _clone_to_gpu(faiss, index: dict[str, object], faiss_index, gpu_mode: str):
+    """Clone faiss_index to GPU 0 once and remember it on the loaded index dict.
+
+    The loaded dict lives in the caller's index cache, so the host-to-device copy
+    happens once per index file rather than per query. The lock keeps concurrent
+    first queries from cloning twice, and all clones share one
+    StandardGpuResources (each instance reserves its own scratch memory).
+
+    A failed clone in auto mode is remembered too (_gpu_clone_failed), so later
+    queries search on CPU instead of retrying the copy under the global lock.
+    """
+    global _gpu_resources
+    with _gpu_lock:
+        cached_gpu = index.get("_faiss_index_gpu")
+        if cached_gpu is not None or index.get("_gpu_clone_failed"):
+            return cached_gpu
+        cpu_to_gpu = getattr(faiss, "index_cpu_to_gpu", None)
+        resources_cls = getattr(faiss, "StandardGpuResources", None)
+        if not callable(cpu_to_gpu) or resources_cls is None:
+            if gpu_mode == "1":
+                raise RuntimeError("FAISS GPU APIs not available in this build")
+            index["_gpu_clone_failed"] = True
+            return None
+        try:
+            if _gpu_resources is None:
+                _gpu_resources = resources_cls()
+            gpu_index = cpu_to_gpu(_gpu_resources, 0, faiss_index)
+        except Exception:
+            if gpu_mode == "1":
+                raise
+            # Auto mode falls back to CPU for the life of this loaded index; a
+            # rebuilt index file is reloaded and gets a fresh attempt.
+            index["_gpu_clone_failed"] = True
+            return None
+        index["_faiss_index_gpu"] = gpu_index
+        return gpu_index
+
+
+_scratch = threading.local()
+
+
+def _search_into_scratch(search_fn, queries, k: int, distance_dtype: str):
+    """Run search_fn with this thread's reusable D/I output arrays.
+
+    Results are read out into Python tuples before the thread's next query, so
+    reusing the buffers is safe and saves two array allocations per search.
+    FAISS builds whose search() lacks the D=/I= keywords get a plain call.
+    """
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    shape = (len(queries), k)
+    key = (shape, distance_dtype)
+    pair = buffers.get(key)
+    if pair is None:
+        np = _load_numpy()
+        pair = (np.empty(shape, dtype=distance_dtype), np.empty(shape, dtype="int64"))
+        buffers[key] = pair
+    try:
+        return search_fn(queries, k, D=pair[0], I=pair[1])
+    except TypeError:
+        return search_fn(queries, k)
+
+
+def _query_binary_index(
+    faiss_index, doc_ids: list[str], query_vecs, k: int
+) -> list[tuple[str, float]]:
+    # IndexBinary reports Hamming distances as int32.
+    distances, indices = _search_into_scratch(
+        faiss_index.search, _binary_codes(query_vecs), k, "int32"
+    )
+    dim = int(faiss_index.d)
+    out: list[tuple[str, float]] = []
+    for rank in range(k):
+        idx = int(indices[0][rank])
+        if idx < 0 or idx >= len(doc_ids):
+            continue
+        # Map Hamming distance onto [-1, 1] so scores read like cosine similarity.
+        score = 1.0 - 2.0 * float(distances[0][rank]) / dim
+        out.append((doc_ids[idx], score))
+    return out
+
+
+def _binary_codes(vectors):
+    # Sign bit per dimension, packed 8 per byte (the layout IndexBinary expects).
+    np = _load_numpy()
+    return np.packbits(vectors > 0, axis=1)
+
+
+def _build_faiss_index(vectors, dim: int, ann: str = "exact", quant: str = "sq8"):
     faiss = _load_faiss()
-    faiss.normalize_L2(vectors)
-    index = faiss.IndexFlatIP(dim)
+    if quant == "binary":
+        # 1 bit per dimension: 32x smaller than FP32; Hamming distance via popcnt.
+        index = faiss.IndexBinaryFlat(dim)
+        index.add(_binary_codes(vectors))
+        return index
+    if ann == "ivfpq":
+        # Product quantization replaces the quant setting here: each vector is
+        # stored as dim/8 one-byte codes, and a query scans nprobe of nlist lists.
+        nlist = max(1, int(4 * math.sqrt(len(vectors))))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(
+            quantizer,
+            dim,
+            nlist,
+            dim // _IVFPQ_SUBVECTOR_DIM,
+            8,
+            faiss.METRIC_INNER_PRODUCT,
+        )
+        index.train(vectors)
+        index.nprobe = _IVFPQ_NPROBE
+    elif ann == "hnsw":
+        # Graph search visits O(log N) vectors per query instead of all N. efSearch
+        # is serialized with the index, so readers need no extra tuning.
+        if quant == "flat":
+            index = faiss.IndexHNSWFlat(dim, _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWSQ(
+                dim,
+                _scalar_quantizer_type(faiss, quant),
+                _HNSW_M,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+            index.train(vectors)
+        index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = _HNSW_EF_SEARCH
+    elif quant == "flat":
+        index = faiss.IndexFlatIP(dim)
+    else:
+        # 8-bit scalar quantization: 4x smaller index and 4x less memory traffic
+        # per search; cosine ranking on normalized vectors is barely affected.
+        # fp16 halves both instead, for corpora where sq8 recall is not enough.
+        index = faiss.IndexScalarQuantizer(
+            dim, _scalar_quantizer_type(faiss, quant), faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
     index.add(vectors)
     return index
 
 
+def _scalar_quantizer_type(faiss, quant: str):
+    if quant == "fp16":
+        return faiss.ScalarQuantizer.QT_fp16
+    return faiss.ScalarQuantizer.QT_8bit
+
+
+_embedder_lock = threading.Lock()
+
+
 def _get_embedder():
-    TextEmbedding = _load_fastembed_text_embedding()
+    """Return the shared TextEmbedding for the current env configuration.
+
+    Loading the ONNX model is the slow part of a query, so instances are cached
+    per (model, cache dir, device); changing the cache dir or device env vars
+    builds a new one instead of reusing a stale instance.
+    """
+    config = _resolve_embedder_config()
+    # Serialize the first construction so concurrent requests load the model once.
+    with _embedder_lock:
+        return _make_embedder(*config)
 
+
+def _resolve_embedder_config() -> tuple[str, str, str]:
     cache_dir = (
         os.environ.get("FASTEMBED_CACHE_DIR", "").strip()
         or os.environ.get("FASTEMBED_CACHE_PATH", "").strip()
@@ -228,6 +475,12 @@ def _get_embedder():
     device = os.environ.get("FASTEMBED_DEVICE", "auto").strip().lower() or "auto"
     if device not in {"auto", "cuda", "cpu"}:
         device = "auto"
+    return DEFAULT_EMBED_MODEL, cache_dir, device
+
+
+@lru_cache(maxsize=4)
+def _make_embedder(model_name: str, cache_dir: str, device: str):
+    TextEmbedding = _load_fastembed_text_embedding()
 
     providers: list[object] | None = None
     want_cuda = device in {"auto", "cuda"}
@@ -255,29 +508,129 @@ def _get_embedder():
     try:
         if providers:
             return TextEmbedding(
-                model_name=DEFAULT_EMBED_MODEL,
+                model_name=model_name,
                 cache_dir=cache_dir,
                 providers=providers,
             )
-        return TextEmbedding(model_name=DEFAULT_EMBED_MODEL, cache_dir=cache_dir)
+        return TextEmbedding(model_name=model_name, cache_dir=cache_dir)
     except TypeError:
         # Older fastembed versions may not accept providers/cuda args.
         if device == "cuda":
             raise
-        return TextEmbedding(model_name=DEFAULT_EMBED_MODEL, cache_dir=cache_dir)
+        return TextEmbedding(model_name=model_name, cache_dir=cache_dir)
+
+
+def _embed_texts_cached(texts: list[str], cache_path: Path):
+    np = _load_numpy()
+    digests = [
+        hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        for text in texts
+    ]
+    cached = _read_embedding_cache(cache_path)
+    rows = {digest: row for row, digest in enumerate(cached[0])} if cached else {}
+    todo: dict[bytes, str] = {}
+    for digest, text in zip(digests, texts):
+        if digest not in rows and digest not in todo:
+            todo[digest] = text
+
+    if not todo:
+        pool = cached[1]
+    else:
+        fresh = _embed_texts(_get_embedder(), list(todo.values()))
+        if fresh.size == 0:
+            return fresh
+        if cached is not None and cached[1].shape[1] != fresh.shape[1]:
+            # Same model name but a different width: every cached vector is
+            # stale, so re-embed the cache hits along with the misses.
+            todo = dict(zip(digests, texts))
+            fresh = _embed_texts(_get_embedder(), list(todo.values()))
+            cached = None
+        if cached is None:
+            rows = {}
+            pool = fresh
+        else:
+            pool = np.concatenate([cached[1], fresh])
+        base = len(pool) - len(fresh)
+        for offset, digest in enumerate(todo):
+            rows[digest] = base + offset
+
+    vectors = np.ascontiguousarray(pool[[rows[digest] for digest in digests]])
+    _write_embedding_cache(cache_path, digests, vectors)
+    return vectors
+
+
+def _read_embedding_cache(cache_path: Path):
+    """Return (digests, vectors) from a previous build, or None if unusable."""
+    np = _load_numpy()
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            if str(data["model"]) != DEFAULT_EMBED_MODEL:
+                return None
+            digests = [row.tobytes() for row in data["digests"]]
+            vectors = np.asarray(data["vectors"], dtype="float32")
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    if vectors.ndim != 2 or len(vectors) != len(digests):
+        return None
+    return digests, vectors
+
+
+def _write_embedding_cache(cache_path: Path, digests: list[bytes], vectors) -> None:
+    np = _load_numpy()
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                model=np.array(DEFAULT_EMBED_MODEL),
+                # Raw uint8 rows: an "S16" array would strip trailing NUL bytes.
+                digests=np.frombuffer(b"".join(digests), dtype="uint8").reshape(-1, 16),
+                vectors=vectors,
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # The cache only saves work on the next build; never fail this one.
+        tmp_path.unlink(missing_ok=True)
+
+
+def _embed_batch_size() -> int:
+    value = _as_int(os.environ.get("EMBED_BATCH_SIZE", "256"))
+    return value if value > 0 else 256
 
 
 def _embed_texts(embedder, texts: list[str]):
     np = _load_numpy()
-    vectors = list(embedder.embed(texts))
-    if not vectors:
+    vectors = iter(embedder.embed(texts, batch_size=_embed_batch_size()))
+    first = next(vectors, None)
+    if first is None:
         return np.empty((0, 0), dtype="float32")
-    arr = np.asarray(vectors, dtype="float32")
-    if arr.ndim != 2:
+    first = np.asarray(first, dtype="float32")
+    if first.ndim != 1:
         raise RuntimeError("embedding model returned invalid vector shape")
-    return arr
+    # Stream into one preallocated matrix instead of holding a list of N arrays
+    # and copying it again with np.asarray.
+    out = np.empty((len(texts), first.shape[0]), dtype="float32")
+    out[0] = first
+    filled = 1
+    for vector in vectors:
+        if filled == len(out):
+            raise RuntimeError("embedding model returned more vectors than texts")
+        out[filled] = vector
+        filled += 1
+    if filled != len(out):
+        raise RuntimeError("embedding model returned fewer vectors than texts")
+    # L2-normalize in place so inner product is cosine for documents and queries
+    # alike; out is already C-contiguous float32, so FAISS takes it without a copy.
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    out /= norms
+    return out
 
 
+# The _load_* helpers import lazily (keeping app startup free of faiss/onnx) and
+# memoize the module: per-query calls skip importlib after the first hit.
+# Failed imports raise and are retried on the next call.
+@lru_cache(maxsize=1)
 def _load_numpy():
     try:
         return importlib.import_module("numpy")
@@ -285,6 +638,7 @@ def _load_numpy():
         raise RuntimeError("numpy is not installed (required for dense index)") from exc
 
 
+@lru_cache(maxsize=1)
 def _load_faiss():
     try:
         return importlib.import_module("faiss")
@@ -292,6 +646,7 @@ def _load_faiss():
         raise RuntimeError("faiss is not installed (required for dense index)") from exc
 
 
+@lru_cache(maxsize=1)
 def _load_fastembed_text_embedding():
     try:
         module = importlib.import_module("fastembed")
@@ -306,41 +661,17 @@ def _load_fastembed_text_embedding():
 
 
 def _as_int(value: object) -> int:
-    if isinstance(value, int):
-        return value
-    if isinstance(value, float):
-        return int(value)
-    if isinstance(value, str):
-        try:
-            return int(float(value))
-        except ValueError:
-            return 0
-    return 0
-
-
-def _tokenize(text: str) -> list[str]:
-    # Retained for compatibility with older sparse-index callers; no longer used.
-    raw = re.findall(r"[A-Za-z][A-Za-z0-9_]+", text)
-    tokens = [token.lower() for token in raw if len(token) >= 3]
-    for run in re.findall(r"[\u4e00-\u9fff]+", text):
-        if len(run) == 1:
-            tokens.append(run)
-        else:
-            for idx in range(len(run) - 1):
-                tokens.append(run[idx : idx + 2])
-    return tokens
-
-
-def _cosine(a: dict[str, float], b: dict[str, float]) -> float:
-    dot = 0.0
-    norm_a = 0.0
-    norm_b = 0.0
-    for token, value in a.items():
-        norm_a += value * value
-        if token in b:
-            dot += value * float(b[token])
-    for value in b.values():
-        norm_b += float(value) * float(value)
-    if norm_a == 0.0 or norm_b == 0.0:
-        return 0.0
-    return dot / math.sqrt(norm_a * norm_b)
+    # Ints (and numpy integers) take the first branch; floats and numeric
+    # strings the second or third. Anything unparsable maps to 0.
+    try:
+        return operator.index(value)
+    except TypeError:
+        pass
+    try:
+        return int(value)  # type: ignore[reportArgumentType]
+    except (TypeError, ValueError, OverflowError):
+        pass
+    try:
+        return int(float(value))  # type: ignore[reportArgumentType]
+    except (TypeError, ValueError, OverflowError):
+        return 0
@@ -84,11 +84,19 @@ export type Project = {
 };
 
 export async function listProjects(): Promise<Project[]> {
-  const res = await fetchWithFallback(`/projects`);
-  if (!res.ok) {
-    throw new Error("Failed to load projects");
-  }
-  return res.json();
+  // The backend pages results; follow X-Next-Cursor until the list is exhausted.
+  const projects: Project[] = [];
+  let cursor: string | null = null;
+  do {
+    const query: string = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetchWithFallback(`/projects${query}`);
+    if (!res.ok) {
+      throw new Error("Failed to load projects");
+    }
+    projects.push(...((await res.json()) as Project[]));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return projects;
 }
 
 export async function createProject(payload: {
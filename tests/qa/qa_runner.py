@@ -1,98 +1,314 @@
 #!/usr/bin/env python3
 import argparse
 import datetime as _dt
+import http.client
 import json
 import os
+import random
+import re
 import sys
-import urllib.error
-import urllib.request
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from json.encoder import encode_basestring_ascii
 
+try:
+    import orjson
+except ImportError:  # optional: the runner works with the stdlib alone
+    orjson = None
 
-def _iter_sse_events(resp):
-    buf = []
+
+def _loads(data):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj, pretty=False):
+    """UTF-8 JSON bytes with a trailing newline; compact unless pretty."""
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return (text + "\n").encode("utf-8")
+
+
+def _question_body(question):
+    """Request body for /ask-stream; only the one string needs JSON escaping."""
+    if orjson is not None:
+        return b'{"question":' + orjson.dumps(question) + b"}"
+    return b'{"question":' + encode_basestring_ascii(question).encode("ascii") + b"}"
+
+
+_READ_SIZE = 64 * 1024
+_CR = b"\r"
+_CRLF = b"\r\n"
+_LF = b"\n"
+_DATA_PREFIX = b"data:"
+_COMMENT_PREFIX = b":"
+
+
+def _iter_lines(resp):
+    """Yield SSE lines (terminator removed) from large buffered reads.
+
+    read1 returns whatever is already available (up to _READ_SIZE) instead of
+    blocking for a full buffer, so events are still seen as they stream in.
+    CRLF and bare CR are folded into LF once per buffer rather than per line; a
+    trailing CR is held back in case its LF arrives with the next read.
+    """
+    read = getattr(resp, "read1", None) or resp.read
+    pending = b""
     while True:
-        line = resp.readline()
-        if not line:
-            if buf:
-                yield buf
+        chunk = read(_READ_SIZE)
+        if not chunk:
+            if pending:
+                yield pending.rstrip(_CR)
             return
-        try:
-            text = line.decode("utf-8")
-        except UnicodeDecodeError:
-            text = line.decode("utf-8", errors="replace")
+        data = pending + chunk
+        held = b""
+        if data.endswith(_CR):
+            data, held = data[:-1], _CR
+        lines = data.replace(_CRLF, _LF).replace(_CR, _LF).split(_LF)
+        pending = lines.pop() + held
+        yield from lines
 
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
-        if text == "\n":
+
+def _iter_sse_events(resp):
+    # Lines stay bytes end to end: the payload goes to the JSON parser as-is, so
+    # there is no per-line UTF-8 decode.
+    buf = []
+    for line in _iter_lines(resp):
+        if not line:
             if buf:
                 yield buf
                 buf = []
             continue
-        buf.append(text)
+        if line.startswith(_COMMENT_PREFIX):
+            # Keepalive comments never reach an event buffer, so a comment-only
+            # event is not yielded at all.
+            continue
+        buf.append(line)
+    if buf:
+        yield buf
 
 
 def _parse_sse_data(lines):
     data_lines = []
     for line in lines:
-        if line.startswith(":"):
-            continue
-        if line.startswith("data:"):
-            value = line[5:]
-            if value.startswith(" "):
+        if line.startswith(_DATA_PREFIX):
+            value = line[len(_DATA_PREFIX) :]
+            if value.startswith(b" "):
                 value = value[1:]
-            data_lines.append(value.rstrip("\n"))
+            data_lines.append(value)
     if not data_lines:
         return None
-    return "\n".join(data_lines)
+    return _LF.join(data_lines)
+
+
+# A plain-text chunk event, the bulk of any stream: {"chunk":"<JSON string>"}.
+_CHUNK_PREFIX = b'{"chunk":"'
+_CHUNK_SUFFIX = b'"}'
+# Bytes that need JSON unescaping (or make the string invalid) when present.
+_JSON_STRING_SPECIAL_RE = re.compile(rb'["\\\x00-\x1f]')
+
+
+def _chunk_text(data):
+    """The text of an escape-free chunk event without a JSON parse, else None.
+
+    Only worth it on the stdlib path: orjson parses these small events faster
+    than this check runs, so the caller skips it when orjson is installed.
+    """
+    if not (data.startswith(_CHUNK_PREFIX) and data.endswith(_CHUNK_SUFFIX)):
+        return None
+    raw = data[len(_CHUNK_PREFIX) : -len(_CHUNK_SUFFIX)]
+    if _JSON_STRING_SPECIAL_RE.search(raw) is not None:
+        return None
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+_thread_state = threading.local()
+
+
+def _connection(api_base, timeout_s):
+    """This thread's keep-alive connection to api_base, opened on first use.
+
+    Returns (conn, path_prefix, reused). Each pool worker keeps its own
+    connection, so a run pays one TCP (and TLS) handshake per worker rather
+    than one per question.
+    """
+    cached = getattr(_thread_state, "conn", None)
+    if cached is not None and cached[0] == api_base:
+        return cached[1], cached[2], True
+    _drop_connection()
+    parts = urllib.parse.urlsplit(api_base)
+    if parts.scheme == "https":
+        conn_cls = http.client.HTTPSConnection
+    elif parts.scheme == "http":
+        conn_cls = http.client.HTTPConnection
+    else:
+        raise RuntimeError(f"Unsupported API base URL: {api_base}")
+    conn = conn_cls(parts.hostname, parts.port, timeout=timeout_s)
+    prefix = parts.path.rstrip("/")
+    _thread_state.conn = (api_base, conn, prefix)
+    return conn, prefix, False
+
+
+def _drop_connection():
+    cached = getattr(_thread_state, "conn", None)
+    _thread_state.conn = None
+    if cached is not None:
+        cached[1].close()
+
+
+def _post(api_base, path, body, headers, timeout_s):
+    while True:
+        conn, prefix, reused = _connection(api_base, timeout_s)
+        try:
+            conn.request("POST", prefix + path, body, headers)
+            return conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            _drop_connection()
+            # The server may close an idle keep-alive connection at any time;
+            # retry once on a fresh one.
+            if not reused:
+                raise
+
+
+_RETRY_ATTEMPTS = 4
+_RETRY_BASE_DELAY_S = 0.25
+_RETRY_AFTER_MAX_S = 60.0
+# Rate limiting and proxy/overload responses: nothing was streamed yet.
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def _retry_delay(attempt, resp=None):
+    retry_after = resp.getheader("Retry-After") if resp is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), _RETRY_AFTER_MAX_S)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return _RETRY_BASE_DELAY_S * 2**attempt + random.random() * 0.1
+
+
+def _open_stream(api_base, path, body, headers, timeout_s):
+    """POST and return a response with a non-error status.
+
+    Connection failures and the statuses in _RETRY_STATUSES are retried with
+    exponential backoff (or the server's Retry-After); once a stream has been
+    handed back nothing is retried, so a question is never answered twice.
+    """
+    for attempt in range(_RETRY_ATTEMPTS):
+        last = attempt == _RETRY_ATTEMPTS - 1
+        try:
+            resp = _post(api_base, path, body, headers, timeout_s)
+            if resp.status < 400:
+                return resp
+            raw = resp.read().decode("utf-8", errors="replace")
+        except (OSError, http.client.HTTPException) as err:
+            _drop_connection()
+            if last:
+                raise RuntimeError(f"Request failed: {err}")
+            time.sleep(_retry_delay(attempt))
+            continue
+        if resp.will_close:
+            _drop_connection()
+        if last or resp.status not in _RETRY_STATUSES:
+            raise RuntimeError(f"HTTP error {resp.status}: {raw.strip()}")
+        time.sleep(_retry_delay(attempt, resp))
+
+
+# Bytes read past done/error to keep the connection before giving up on it.
+_DRAIN_MAX = 64 * 1024
+
+
+def _finish_response(resp):
+    """Stop reading a stream after done/error, keeping the connection if cheap.
+
+    done/error is the backend's last event, so normally only the chunked
+    terminator is left and reading it makes the connection reusable. A server
+    that keeps streaming past _DRAIN_MAX is cut off instead: the connection is
+    closed, which also tells it to stop producing.
+    """
+    read = getattr(resp, "read1", None) or resp.read
+    drained = 0
+    try:
+        while drained <= _DRAIN_MAX:
+            data = read(_READ_SIZE)
+            if not data:
+                return
+            drained += len(data)
+    except (OSError, http.client.HTTPException):
+        pass  # the answer is already complete; just don't reuse the socket
+    resp.close()
+    _drop_connection()
 
 
 def ask_stream(api_base, project_id, question, timeout_s=120):
-    url = f"{api_base.rstrip('/')}/projects/{project_id}/ask-stream"
-    body = json.dumps({"question": question}).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=body,
-        headers={
-            "Content-Type": "application/json",
-            "Accept": "text/event-stream",
-        },
-        method="POST",
-    )
+    path = f"/projects/{project_id}/ask-stream"
+    body = _question_body(question)
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
 
     chunks = []
     final = None
     errors = []
+    resp = _open_stream(api_base, path, body, headers, timeout_s)
     try:
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            for event_lines in _iter_sse_events(resp):
-                data = _parse_sse_data(event_lines)
-                if not data:
-                    continue
-                try:
-                    payload = json.loads(data)
-                except json.JSONDecodeError:
-                    continue
-
-                if isinstance(payload, dict) and payload.get("chunk"):
-                    chunks.append(str(payload.get("chunk")))
-
-                if isinstance(payload, dict) and payload.get("error"):
-                    errors.append(str(payload.get("error")))
-                    break
-
-                if isinstance(payload, dict) and payload.get("done"):
-                    final = payload
-                    break
-    except urllib.error.HTTPError as err:
-        try:
-            raw = err.read().decode("utf-8", errors="replace")
-        except Exception:
-            raw = ""
-        raise RuntimeError(f"HTTP error {err.code}: {raw.strip()}")
-    except urllib.error.URLError as err:
+        for event_lines in _iter_sse_events(resp):
+            data = _parse_sse_data(event_lines)
+            if not data:
+                continue
+            text = None if orjson is not None else _chunk_text(data)
+            if text is not None:
+                if text:
+                    chunks.append(text)
+                continue
+            try:
+                payload = _loads(data)
+            except ValueError:
+                # Malformed JSON, or (stdlib path) bytes that are not UTF-8.
+                continue
+
+            if not isinstance(payload, dict):
+                continue
+            # The backend sends chunk, error and done as separate events, and
+            # chunks are by far the most common, so check them first.
+            chunk = payload.get("chunk")
+            if chunk:
+                chunks.append(str(chunk))
+                continue
+            error = payload.get("error")
+            if error:
+                errors.append(str(error))
+                break
+            if payload.get("done"):
+                final = payload
+                break
+        _finish_response(resp)
+    except (OSError, http.client.HTTPException) as err:
+        _drop_connection()
         raise RuntimeError(f"Request failed: {err}")
+    finally:
+        if resp.will_close:
+            _drop_connection()
 
     if final is None:
         final = {}
+    # done carries the full answer, so the streamed chunks are only joined when
+    # the stream ended without one (after an error event).
     answer = str(final.get("answer") or "".join(chunks))
     return {
         "answer": answer,
@@ -101,6 +317,50 @@ def ask_stream(api_base, project_id, question, timeout_s=120):
     }
 
 
+def _build_item(qid, question, expected_route, done, answer, error, elapsed_ns):
+    return {
+        "id": qid,
+        "question": question,
+        "expected_route": expected_route,
+        "route": done.get("route"),
+        "evidence_mix": done.get("evidence_mix"),
+        "insufficient_evidence": done.get("insufficient_evidence"),
+        "answer": answer,
+        "code_refs": done.get("code_refs"),
+        "evidence": done.get("evidence"),
+        "error": error,
+        "elapsed_ns": elapsed_ns,
+    }
+
+
+def _run_item(api_base, project_id, item):
+    qid = str(item.get("id", ""))
+    question = str(item.get("question", "")).strip()
+    if not question:
+        return None
+    expected_route = str(item.get("expected_route", ""))
+    # A monotonic integer clock per item; wall-clock timestamps are only taken
+    # once for the whole run.
+    started_ns = time.perf_counter_ns()
+    try:
+        resp = ask_stream(api_base, project_id, question)
+    except Exception as err:
+        elapsed_ns = time.perf_counter_ns() - started_ns
+        return _build_item(
+            qid, question, expected_route, {}, "", str(err), elapsed_ns
+        )
+    elapsed_ns = time.perf_counter_ns() - started_ns
+    return _build_item(
+        qid,
+        question,
+        expected_route,
+        resp.get("done_payload") or {},
+        resp.get("answer", ""),
+        (resp.get("errors") or [None])[0],
+        elapsed_ns,
+    )
+
+
 def main(argv):
     parser = argparse.ArgumentParser(
         description="Run a small QA set against /ask-stream"
@@ -109,69 +369,80 @@ def main(argv):
     parser.add_argument("--project-id", required=True)
     parser.add_argument("--in", dest="in_path", required=True)
     parser.add_argument("--out", dest="out_path", required=True)
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="write a header line then one JSON line per result as it finishes",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="indent the JSON report (default: compact; --jsonl is always compact)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="questions in flight at once (default: 4; 1 runs them sequentially)",
+    )
     args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
 
-    with open(args.in_path, "r", encoding="utf-8") as f:
-        qa = json.load(f)
+    with open(args.in_path, "rb") as f:
+        qa = _loads(f.read())
     items = qa.get("items")
     if not isinstance(items, list):
         raise RuntimeError("Invalid QA set: missing items[]")
 
     started_at = _dt.datetime.now(_dt.timezone.utc).isoformat()
-    results = {
+    header = {
         "project_id": args.project_id,
         "api_base": args.api_base,
         "started_at": started_at,
-        "items": [],
     }
 
-    for item in items:
-        qid = str(item.get("id", ""))
-        question = str(item.get("question", "")).strip()
-        if not question:
-            continue
-        expected_route = str(item.get("expected_route", ""))
-        try:
-            resp = ask_stream(args.api_base, args.project_id, question)
-            done = resp.get("done_payload") or {}
-            results["items"].append(
-                {
-                    "id": qid,
-                    "question": question,
-                    "expected_route": expected_route,
-                    "route": done.get("route"),
-                    "evidence_mix": done.get("evidence_mix"),
-                    "insufficient_evidence": done.get("insufficient_evidence"),
-                    "answer": resp.get("answer", ""),
-                    "code_refs": done.get("code_refs"),
-                    "evidence": done.get("evidence"),
-                    "error": (resp.get("errors") or [None])[0],
-                }
-            )
-        except Exception as err:
-            results["items"].append(
-                {
-                    "id": qid,
-                    "question": question,
-                    "expected_route": expected_route,
-                    "route": None,
-                    "evidence_mix": None,
-                    "insufficient_evidence": None,
-                    "answer": "",
-                    "code_refs": None,
-                    "evidence": None,
-                    "error": str(err),
-                }
-            )
-
     out_dir = os.path.dirname(args.out_path)
     if out_dir:
         os.makedirs(out_dir, exist_ok=True)
-    with open(args.out_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=True, indent=2)
-        f.write("\n")
+
+    if args.jsonl:
+        # One line per result, flushed as it lands: memory stays at one
+        # response and an interrupted run keeps everything finished so far.
+        with open(args.out_path, "wb") as f:
+            f.write(_dumps(header))
+            for line in _iter_results(args, items, encode=_dumps):
+                f.write(line)
+                f.flush()
+        return 0
+
+    results = {**header, "items": list(_iter_results(args, items))}
+    results["finished_at"] = _dt.datetime.now(_dt.timezone.utc).isoformat()
+    # Write beside the target and swap it in, so a crash mid-write never leaves
+    # a truncated report (or clobbers the previous one).
+    tmp_path = args.out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_dumps(results, pretty=args.pretty))
+    os.replace(tmp_path, args.out_path)
     return 0
 
 
+def _iter_results(args, items, encode=None):
+    # Each item is an independent, network-bound request, so a small thread pool
+    # overlaps their latencies; map() keeps results in input order. With encode,
+    # results are serialized on the worker that fetched them and the caller is
+    # left as a plain single writer.
+    def run(item):
+        result = _run_item(args.api_base, args.project_id, item)
+        if result is not None and encode is not None:
+            return encode(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for result in pool.map(run, items):
+            if result is not None:
+                yield result
+
+
 if __name__ == "__main__":
     raise SystemExit(main(sys.argv[1:]))